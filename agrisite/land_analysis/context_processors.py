@@ -1,25 +1,47 @@
-from django.db.models import Sum, Count, Avg
+from django.core.cache import cache
+from django.db import DatabaseError
 from .models import LandHolder, LandParcel, CroppingPattern
+from .utils import fetch_table_totals
+
+GLOBAL_STATS_CACHE_KEY = 'global_stats_v1'
+GLOBAL_STATS_TIMEOUT = 60  # seconds
+
+# Pages that never show the global statistics
+GLOBAL_STATS_EXCLUDED_URLS = {'login', 'signup'}
+
+def _fetch_global_stats():
+    """Fetch all global statistics in a single database round-trip"""
+    stats = fetch_table_totals(
+        total_land_holders=('COUNT', LandHolder, None),
+        total_parcels=('COUNT', LandParcel, None),
+        total_cultivated_area=('SUM', LandParcel, 'cultivated_area'),
+        total_crops_planted=('COUNT', CroppingPattern, None),
+    )
+    stats['total_cultivated_area'] = stats['total_cultivated_area'] or 0
+    return stats
 
 def global_stats(request):
     """Add global statistics to all templates"""
-    try:
-        stats = {
-            'total_land_holders': LandHolder.objects.count(),
-            'total_parcels': LandParcel.objects.count(),
-            'total_cultivated_area': LandParcel.objects.aggregate(
-                Sum('cultivated_area')
-            )['cultivated_area__sum'] or 0,
-            'total_crops_planted': CroppingPattern.objects.count(),
-        }
-    except:
-        stats = {
-            'total_land_holders': 0,
-            'total_parcels': 0,
-            'total_cultivated_area': 0,
-            'total_crops_planted': 0,
+    resolver_match = request.resolver_match
+    if not resolver_match or resolver_match.url_name in GLOBAL_STATS_EXCLUDED_URLS:
+        return {
+            'global_stats': None,
+            'app_name': 'AgriSite',
         }
     
+    stats = cache.get(GLOBAL_STATS_CACHE_KEY)
+    if stats is None:
+        try:
+            stats = _fetch_global_stats()
+            cache.set(GLOBAL_STATS_CACHE_KEY, stats, GLOBAL_STATS_TIMEOUT)
+        except DatabaseError:
+            stats = {
+                'total_land_holders': 0,
+                'total_parcels': 0,
+                'total_cultivated_area': 0,
+                'total_crops_planted': 0,
+            }
+    
     return {
         'global_stats': stats,
         'app_name': 'AgriSite',
@@ -0,0 +1,201 @@
+import csv
+import io
+import logging
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import Sum, Avg, Count
+from .models import LandHolder, LandParcel, IrrigationSystem, CroppingPattern
+from .utils import COMPREHENSIVE_REPORT_CACHE_KEY, COMPREHENSIVE_REPORT_TIMEOUT, dumps_json, fetch_table_totals
+
+logger = logging.getLogger(__name__)
+
+EXPORT_CHUNK_SIZE = 2000  # rows fetched per round-trip when exporting whole tables
+EXPORT_JOBS_DIR = 'exports'  # under MEDIA_ROOT
+EXPORT_JOB_TIMEOUT = 24 * 3600  # seconds a finished export stays downloadable
+EXPORT_JOB_WORKERS = 2
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'excel': ('application/vnd.ms-excel', 'xlsx'),
+    'json': ('application/json', 'json'),
+}
+
+# Background exports share one small pool per process, so they never hold a request worker.
+# A job runs in the process that queued it and is lost if that process restarts; only its
+# state is shared, through the cache, which is why views only offer them with REDIS_URL set
+_job_executor = ThreadPoolExecutor(max_workers=EXPORT_JOB_WORKERS, thread_name_prefix='export')
+
+# Model and exported columns for each table export, keyed by the URL's data type
+EXPORT_SPECS = {
+    'land_parcels': (LandParcel, (
+        'parcel_id', 'total_area', 'cultivated_area', 'soil_type',
+        'land_holder__name', 'land_holder__region__name'
+    )),
+    'cropping_patterns': (CroppingPattern, (
+        'crop__name', 'year', 'season', 'area_allocated',
+        'yield_amount', 'revenue', 'land_parcel__parcel_id'
+    )),
+    'irrigation_systems': (IrrigationSystem, (
+        'system_type', 'efficiency_rating', 'annual_water_usage',
+        'land_parcel__parcel_id'
+    )),
+}
+
+def export_queryset(data_type):
+    """Return the values() queryset and column names behind a table export, or None"""
+    spec = EXPORT_SPECS.get(data_type)
+    if spec is None:
+        return None
+    model, fields = spec
+    # values() over related paths already fetches everything with JOINs in a single
+    # query and never builds model instances, so select_related() would be ignored here
+    return model.objects.values(*fields), fields
+
+class _Echo:
+    """File-like object whose write() hands the value back, so csv.writer can feed a generator"""
+    def write(self, value):
+        return value
+
+def stream_csv(queryset, fields):
+    """Yield CSV lines for a header row and then each row of the queryset, chunk by chunk"""
+    writer = csv.writer(_Echo(), lineterminator='\n')
+    yield writer.writerow(fields)
+    for row in queryset.values_list(*fields).iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield writer.writerow(row)
+
+def stream_json(rows):
+    """Yield a JSON array one encoded row at a time, matching OrjsonResponse's output"""
+    yield b'['
+    for index, row in enumerate(rows):
+        yield (b',' if index else b'') + dumps_json(row)
+    yield b']'
+
+def excel_bytes(queryset, fields):
+    """Build an .xlsx workbook from the queryset, fetched chunk by chunk"""
+    # xlsxwriter is only needed here, so other formats never pay for importing it
+    import xlsxwriter
+    buffer = io.BytesIO()
+    # constant_memory flushes each row to a temporary file as soon as it is written
+    workbook = xlsxwriter.Workbook(buffer, {'constant_memory': True})
+    worksheet = workbook.add_worksheet()
+    # Same header style pandas' to_excel used
+    header = workbook.add_format({'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'})
+    worksheet.write_row(0, 0, fields, header)
+    rows = queryset.values_list(*fields).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    for index, row in enumerate(rows, 1):
+        # Decimals are written as numbers and None as an empty cell
+        worksheet.write_row(index, 0, row)
+    workbook.close()
+    return buffer.getvalue()
+
+def _report_summary():
+    """Headline counts and totals of the comprehensive report, fetched in one round-trip"""
+    summary = fetch_table_totals(
+        total_land_holders=('COUNT', LandHolder, None),
+        total_parcels=('COUNT', LandParcel, None),
+        total_cultivated_area=('SUM', LandParcel, 'cultivated_area'),
+        total_revenue=('SUM', CroppingPattern, 'revenue'),
+    )
+    summary['total_cultivated_area'] = summary['total_cultivated_area'] or 0
+    summary['total_revenue'] = summary['total_revenue'] or 0
+    return summary
+
+def _comprehensive_report_data():
+    """Aggregates behind the comprehensive report download"""
+    return {
+        'summary': _report_summary(),
+        'land_analysis': list(LandHolder.objects.values('ownership_type').annotate(
+            count=Count('id'),
+            total_land=Sum('parcels__total_area')
+        )),
+        'crop_analysis': list(CroppingPattern.objects.values('crop__name').annotate(
+            total_area=Sum('area_allocated'),
+            total_yield=Sum('yield_amount'),
+            total_revenue=Sum('revenue')
+        )),
+        'irrigation_analysis': list(IrrigationSystem.objects.values('system_type').annotate(
+            count=Count('id'),
+            avg_efficiency=Avg('efficiency_rating')
+        )),
+    }
+
+def get_comprehensive_report_data():
+    """Comprehensive report aggregates, cached for COMPREHENSIVE_REPORT_TIMEOUT or until the data changes"""
+    return cache.get_or_set(
+        COMPREHENSIVE_REPORT_CACHE_KEY, _comprehensive_report_data, COMPREHENSIVE_REPORT_TIMEOUT
+    )
+
+def _job_key(task_id):
+    return f"export_job:{task_id}"
+
+def get_export_job(task_id):
+    """Return the stored state of a background export, or None if unknown or expired"""
+    return cache.get(_job_key(task_id))
+
+def start_export_job(user_id, data_type, format_type):
+    """Queue an export to be written to MEDIA_ROOT/exports/ and return its task id"""
+    if data_type == 'comprehensive_report':
+        content_type, extension = EXPORT_FORMATS['json']
+        filename = 'comprehensive_agricultural_report.json'
+    else:
+        content_type, extension = EXPORT_FORMATS.get(format_type, EXPORT_FORMATS['json'])
+        filename = f"{data_type}.{extension}"
+
+    task_id = uuid.uuid4().hex
+    directory = os.path.join(settings.MEDIA_ROOT, EXPORT_JOBS_DIR)
+    os.makedirs(directory, exist_ok=True)
+    _remove_stale_exports(directory)
+
+    job = {
+        'status': 'PENDING',
+        'user_id': user_id,
+        'filename': filename,
+        'content_type': content_type,
+        'path': os.path.join(directory, f"{task_id}.{extension}"),
+    }
+    cache.set(_job_key(task_id), job, EXPORT_JOB_TIMEOUT)
+    _job_executor.submit(_run_export_job, task_id, job, data_type, format_type)
+    return task_id
+
+def _run_export_job(task_id, job, data_type, format_type):
+    """Write an export file from a worker thread and record how it went"""
+    try:
+        _write_export(job['path'], data_type, format_type)
+        job = {**job, 'status': 'SUCCESS'}
+    except Exception:
+        logger.exception("Background export %s of %s failed", task_id, data_type)
+        job = {**job, 'status': 'FAILURE', 'error': 'Export failed'}
+    finally:
+        # Worker threads get their own database connections; don't leak them
+        connections.close_all()
+    cache.set(_job_key(task_id), job, EXPORT_JOB_TIMEOUT)
+
+def _write_export(path, data_type, format_type):
+    """Write the same content the synchronous export would send to path"""
+    if data_type == 'comprehensive_report':
+        with open(path, 'wb') as f:
+            f.write(dumps_json(get_comprehensive_report_data()))
+        return
+
+    queryset, fields = export_queryset(data_type)
+    if format_type == 'csv':
+        with open(path, 'w', newline='') as f:
+            f.writelines(stream_csv(queryset, fields))
+    elif format_type == 'excel':
+        with open(path, 'wb') as f:
+            f.write(excel_bytes(queryset, fields))
+    else:
+        with open(path, 'wb') as f:
+            f.writelines(stream_json(queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE)))
+
+def _remove_stale_exports(directory):
+    """Delete export files old enough that their job record has expired"""
+    cutoff = time.time() - EXPORT_JOB_TIMEOUT
+    for entry in os.scandir(directory):
+        if entry.is_file() and entry.stat().st_mtime < cutoff:
+            os.remove(entry.path)
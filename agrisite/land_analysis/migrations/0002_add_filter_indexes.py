@@ -0,0 +1,47 @@
+# Generated by Django 5.2.8 on 2026-10-15 05:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('land_analysis', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='crop',
+            name='crop_type',
+            field=models.CharField(choices=[('cereal', 'Cereal'), ('pulse', 'Pulse'), ('vegetable', 'Vegetable'), ('fruit', 'Fruit'), ('cash', 'Cash Crop'), ('fodder', 'Fodder Crop')], db_index=True, max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='crop',
+            name='season',
+            field=models.CharField(choices=[('kharif', 'Kharif (Monsoon)'), ('rabi', 'Rabi (Winter)'), ('zaid', 'Zaid (Summer)'), ('annual', 'Annual')], db_index=True, max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='croppingpattern',
+            name='season',
+            field=models.CharField(choices=[('kharif', 'Kharif (Monsoon)'), ('rabi', 'Rabi (Winter)'), ('zaid', 'Zaid (Summer)'), ('annual', 'Annual')], db_index=True, max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='irrigationsystem',
+            name='system_type',
+            field=models.CharField(choices=[('drip', 'Drip Irrigation'), ('sprinkler', 'Sprinkler System'), ('flood', 'Flood Irrigation'), ('center_pivot', 'Center Pivot'), ('manual', 'Manual Irrigation'), ('none', 'No Irrigation')], db_index=True, max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='landanalysis',
+            name='analysis_date',
+            field=models.DateField(auto_now_add=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='landparcel',
+            name='soil_type',
+            field=models.CharField(choices=[('clay', 'Clay'), ('sandy', 'Sandy'), ('loamy', 'Loamy'), ('silt', 'Silt'), ('peat', 'Peat'), ('chalky', 'Chalky')], db_index=True, max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='croppingpattern',
+            index=models.Index(fields=['year', 'season'], name='cp_year_season_idx'),
+        ),
+    ]
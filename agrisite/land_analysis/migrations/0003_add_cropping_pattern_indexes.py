@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-15 06:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('land_analysis', '0002_add_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='croppingpattern',
+            index=models.Index(fields=['crop', 'year'], name='cp_crop_year_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='croppingpattern',
+            index=models.Index(fields=['land_parcel', 'year'], name='cp_parcel_year_idx'),
+        ),
+    ]
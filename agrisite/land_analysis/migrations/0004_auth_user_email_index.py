@@ -0,0 +1,16 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('land_analysis', '0003_add_cropping_pattern_indexes'),
+    ]
+
+    # auth_user belongs to django.contrib.auth, so the index is created with raw SQL
+    operations = [
+        migrations.RunSQL(
+            'CREATE INDEX IF NOT EXISTS auth_user_email_idx ON auth_user (email);',
+            reverse_sql='DROP INDEX IF EXISTS auth_user_email_idx;',
+        ),
+    ]
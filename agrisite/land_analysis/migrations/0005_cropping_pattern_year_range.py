@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-15 06:06
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('land_analysis', '0004_auth_user_email_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='croppingpattern',
+            name='year',
+            field=models.IntegerField(validators=[django.core.validators.MinValueValidator(2000), django.core.validators.MaxValueValidator(2030)]),
+        ),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('land_analysis', '0005_cropping_pattern_year_range'),
+    ]
+
+    operations = [
+        # INCLUDE columns are PostgreSQL-only; other backends create a plain crop index
+        migrations.AddIndex(
+            model_name='croppingpattern',
+            index=models.Index(fields=['crop'], include=('revenue', 'area_allocated', 'yield_amount'), name='cp_crop_covering_idx'),
+        ),
+    ]
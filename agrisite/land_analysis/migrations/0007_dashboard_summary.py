@@ -0,0 +1,26 @@
+# Generated by Django 5.2.8 on 2026-10-15 06:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('land_analysis', '0006_cropping_pattern_covering_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('avg_productivity', models.FloatField(default=0)),
+                ('total_area', models.FloatField(default=0)),
+                ('total_cultivated_area', models.FloatField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Dashboard Summary',
+            },
+        ),
+    ]
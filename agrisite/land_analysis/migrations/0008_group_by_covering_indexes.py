@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8 on 2026-10-15 06:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('land_analysis', '0007_dashboard_summary'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='irrigationsystem',
+            name='system_type',
+            field=models.CharField(choices=[('drip', 'Drip Irrigation'), ('sprinkler', 'Sprinkler System'), ('flood', 'Flood Irrigation'), ('center_pivot', 'Center Pivot'), ('manual', 'Manual Irrigation'), ('none', 'No Irrigation')], max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='landparcel',
+            name='soil_type',
+            field=models.CharField(choices=[('clay', 'Clay'), ('sandy', 'Sandy'), ('loamy', 'Loamy'), ('silt', 'Silt'), ('peat', 'Peat'), ('chalky', 'Chalky')], max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='irrigationsystem',
+            index=models.Index(fields=['system_type'], include=('efficiency_rating', 'annual_water_usage'), name='is_type_efficiency_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='landholder',
+            index=models.Index(fields=['ownership_type'], include=('id',), name='lh_ownership_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='landparcel',
+            index=models.Index(fields=['soil_type'], include=('total_area', 'cultivated_area'), name='lp_soil_area_idx'),
+        ),
+    ]
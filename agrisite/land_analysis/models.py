@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.core.validators import MinValueValidator, MaxValueValidator
 
 class Region(models.Model):
@@ -27,6 +28,12 @@ class LandHolder(models.Model):
     contact_phone = models.CharField(max_length=15, blank=True)
     region = models.ForeignKey(Region, on_delete=models.CASCADE)
     
+    class Meta:
+        indexes = [
+            # INCLUDE only applies on PostgreSQL; elsewhere this is a plain ownership_type index
+            models.Index(fields=['ownership_type'], include=['id'], name='lh_ownership_idx'),
+        ]
+    
     def __str__(self):
         return f"{self.name} ({self.ownership_type})"
 
@@ -52,6 +59,10 @@ class LandParcel(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Also serves soil_type filters; the areas are INCLUDEd for the GROUP BY sums
+            models.Index(fields=['soil_type'], include=['total_area', 'cultivated_area'], name='lp_soil_area_idx'),
+        ]
     
     def __str__(self):
         return f"{self.parcel_id} - {self.land_holder.name}"
@@ -89,6 +100,15 @@ class IrrigationSystem(models.Model):
     )
     is_automated = models.BooleanField(default=False)
     
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['system_type'],
+                include=['efficiency_rating', 'annual_water_usage'],
+                name='is_type_efficiency_idx'
+            ),
+        ]
+    
     def __str__(self):
         return f"{self.get_system_type_display()} - {self.land_parcel.parcel_id}"
 
@@ -110,8 +130,8 @@ class Crop(models.Model):
     ]
     
     name = models.CharField(max_length=100)
-    crop_type = models.CharField(max_length=20, choices=CROP_TYPES)
-    season = models.CharField(max_length=20, choices=SEASONS)
+    crop_type = models.CharField(max_length=20, choices=CROP_TYPES, db_index=True)
+    season = models.CharField(max_length=20, choices=SEASONS, db_index=True)
     growth_period = models.IntegerField(help_text="Growth period in days")
     water_requirement = models.DecimalField(max_digits=6, decimal_places=2, help_text="Water requirement in mm")
     
@@ -124,8 +144,8 @@ class Crop(models.Model):
 class CroppingPattern(models.Model):
     land_parcel = models.ForeignKey(LandParcel, on_delete=models.CASCADE, related_name='cropping_patterns')
     crop = models.ForeignKey(Crop, on_delete=models.CASCADE)
-    year = models.IntegerField()
-    season = models.CharField(max_length=20, choices=Crop.SEASONS)
+    year = models.IntegerField(validators=[MinValueValidator(2000), MaxValueValidator(2030)])
+    season = models.CharField(max_length=20, choices=Crop.SEASONS, db_index=True)
     area_allocated = models.DecimalField(max_digits=10, decimal_places=2, help_text="Area in hectares")
     yield_amount = models.DecimalField(max_digits=10, decimal_places=2, help_text="Yield in tons")
     revenue = models.DecimalField(max_digits=12, decimal_places=2, help_text="Revenue in local currency")
@@ -133,13 +153,22 @@ class CroppingPattern(models.Model):
     class Meta:
         unique_together = ['land_parcel', 'crop', 'year', 'season']
         ordering = ['-year', 'season']
+        indexes = [
+            models.Index(fields=['year', 'season'], name='cp_year_season_idx'),
+            models.Index(fields=['crop', 'year'], name='cp_crop_year_idx'),
+            models.Index(fields=['land_parcel', 'year'], name='cp_parcel_year_idx'),
+            # Per-crop revenue, area and yield sums can be answered from the index alone
+            models.Index(
+                fields=['crop'], include=['revenue', 'area_allocated', 'yield_amount'], name='cp_crop_covering_idx'
+            ),
+        ]
     
     def __str__(self):
         return f"{self.crop.name} - {self.land_parcel.parcel_id} ({self.year})"
 
 class LandAnalysis(models.Model):
     land_parcel = models.ForeignKey(LandParcel, on_delete=models.CASCADE, related_name='analyses')
-    analysis_date = models.DateField(auto_now_add=True)
+    analysis_date = models.DateField(auto_now_add=True, db_index=True)
     soil_health_index = models.IntegerField(
         validators=[MinValueValidator(1), MaxValueValidator(100)]
     )
@@ -157,4 +186,42 @@ class LandAnalysis(models.Model):
         verbose_name_plural = "Land Analyses"
     
     def __str__(self):
-        return f"Analysis for {self.land_parcel.parcel_id} - {self.analysis_date}"
\ No newline at end of file
+        return f"Analysis for {self.land_parcel.parcel_id} - {self.analysis_date}"
+
+class DashboardSummary(models.Model):
+    """Single-row table of precomputed dashboard totals, refreshed when parcels or analyses change"""
+    avg_productivity = models.FloatField(default=0)
+    total_area = models.FloatField(default=0)
+    total_cultivated_area = models.FloatField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name_plural = "Dashboard Summary"
+    
+    def __str__(self):
+        return f"Dashboard summary ({self.updated_at:%Y-%m-%d %H:%M})"
+    
+    @classmethod
+    def refresh(cls):
+        """Recompute the totals and store them in the single summary row"""
+        parcel_totals = LandParcel.objects.aggregate(
+            total_area=models.Sum('total_area'),
+            total_cultivated_area=models.Sum('cultivated_area')
+        )
+        summary, _ = cls.objects.update_or_create(pk=1, defaults={
+            'avg_productivity': LandAnalysis.objects.aggregate(
+                avg=models.Avg('productivity_score')
+            )['avg'] or 0,
+            'total_area': float(parcel_totals['total_area'] or 0),
+            'total_cultivated_area': float(parcel_totals['total_cultivated_area'] or 0),
+        })
+        # Pages cached from the old row between the write and this refresh would
+        # otherwise keep showing it until they expire
+        from .utils import SUMMARY_STATS_CACHE_KEY, ANALYSIS_REPORTS_CACHE_KEY, DASHBOARD_JSON_CACHE_KEY
+        cache.delete_many([SUMMARY_STATS_CACHE_KEY, ANALYSIS_REPORTS_CACHE_KEY, DASHBOARD_JSON_CACHE_KEY])
+        return summary
+    
+    @classmethod
+    def get(cls):
+        """Return the summary row, computing it the first time it is needed"""
+        return cls.objects.filter(pk=1).first() or cls.refresh()
@@ -8,16 +8,22 @@ from reportlab.lib.units import inch
 from reportlab.lib import colors
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
 from datetime import datetime
+from functools import lru_cache
 import os
 from django.conf import settings
 
+@lru_cache(maxsize=None)
+def _sample_styles():
+    """ReportLab's sample stylesheet, built once per process"""
+    return getSampleStyleSheet()
+
 def generate_land_report_pdf(land_data, request):
     """Generate PDF report for land analysis"""
     buffer = BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=1*inch, bottomMargin=1*inch)
     
     # Create styles
-    styles = getSampleStyleSheet()
+    styles = _sample_styles()
     
     # Custom styles
     title_style = ParagraphStyle(
@@ -193,7 +199,7 @@ def generate_parcel_detail_pdf(parcel, request):
     buffer = BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=A4)
     
-    styles = getSampleStyleSheet()
+    styles = _sample_styles()
     story = []
     
     # Title
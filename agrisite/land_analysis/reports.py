@@ -0,0 +1,323 @@
+import datetime
+from functools import lru_cache
+from django.db.models import Sum, Avg, Count
+from .models import *
+from .utils import get_crop_names
+
+# Try to import reportlab, but provide fallbacks if not available
+try:
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.pagesizes import letter, A4
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, LongTable, TableStyle
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+    from reportlab.lib import colors
+    REPORTLAB_AVAILABLE = True
+except ImportError:
+    REPORTLAB_AVAILABLE = False
+    print("ReportLab not available - PDF generation disabled")
+
+REPORT_CHUNK_SIZE = 500  # rows fetched per round-trip; report tables are read once
+
+RECOMMENDATIONS = (
+    "• Consider expanding high-revenue crop cultivation",
+    "• Optimize irrigation systems for better water efficiency",
+    "• Implement soil health improvement programs",
+    "• Explore diversification of crop patterns",
+    "• Invest in modern agricultural technologies",
+)
+
+@lru_cache(maxsize=None)
+def _table_style(header_font_size, align='CENTER', header_padding=None):
+    """Shared green-header table style, built once per variant"""
+    commands = [
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4CAF50')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), align),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), header_font_size),
+    ]
+    if header_padding is not None:
+        commands.append(('BOTTOMPADDING', (0, 0), (-1, 0), header_padding))
+    commands += [
+        ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#F1F8E9')),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ]
+    return TableStyle(commands)
+
+@lru_cache(maxsize=None)
+def _report_styles():
+    """Sample stylesheet plus the title, heading and body styles of the analysis reports"""
+    styles = getSampleStyleSheet()
+    
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=18,
+        spaceAfter=30,
+        textColor='#2E7D32',
+        alignment=1
+    )
+    
+    heading_style = ParagraphStyle(
+        'CustomHeading',
+        parent=styles['Heading2'],
+        fontSize=14,
+        spaceAfter=12,
+        textColor='#1B5E20',
+        spaceBefore=20
+    )
+    
+    normal_style = ParagraphStyle(
+        'CustomNormal',
+        parent=styles['Normal'],
+        fontSize=10,
+        spaceAfter=12
+    )
+    
+    return styles, title_style, heading_style, normal_style
+
+@lru_cache(maxsize=None)
+def _recommendation_frags():
+    """Parse the recommendation markup once, keeping the text and fragments of each bullet"""
+    normal_style = _report_styles()[3]
+    return tuple(
+        (paragraph.text, paragraph.frags)
+        for paragraph in (Paragraph(rec, normal_style) for rec in RECOMMENDATIONS)
+    )
+
+def _recommendations(normal_style):
+    """Fresh recommendation Paragraphs built from the pre-parsed fragments"""
+    # Paragraphs keep layout state, so only the parse result is shared between reports
+    return [Paragraph(text, normal_style, frags=frags) for text, frags in _recommendation_frags()]
+
+def build_analysis_report(buffer, report_type):
+    """Write the PDF analysis report for report_type into buffer"""
+    # Create the PDF object
+    doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=50, bottomMargin=50)
+    
+    # Container for the 'Flowable' objects
+    story = []
+    
+    # Styles are built once and shared between reports
+    styles, title_style, heading_style, normal_style = _report_styles()
+    
+    # Add title
+    title_text = f"Agricultural Analysis Report - {report_type.title()}"
+    story.append(Paragraph(title_text, title_style))
+    story.append(Spacer(1, 20))
+    
+    # Add report date
+    current_date = datetime.datetime.now().strftime("%B %d, %Y")
+    story.append(Paragraph(f"Generated on: {current_date}", normal_style))
+    story.append(Spacer(1, 30))
+    
+    # Generate content based on report type
+    if report_type == 'summary':
+        story = _generate_summary_report(story, styles, heading_style, normal_style)
+    elif report_type == 'land_analysis':
+        story = _generate_land_analysis_report(story, styles, heading_style, normal_style)
+    elif report_type == 'crop_analysis':
+        story = _generate_crop_analysis_report(story, styles, heading_style, normal_style)
+    elif report_type == 'irrigation_analysis':
+        story = _generate_irrigation_analysis_report(story, styles, heading_style, normal_style)
+    elif report_type == 'comprehensive':
+        story = _generate_comprehensive_report(story, styles, heading_style, normal_style)
+    else:
+        story.append(Paragraph("Invalid report type selected.", normal_style))
+    
+    # Build PDF
+    doc.build(story)
+
+def _generate_summary_report(story, styles, heading_style, normal_style):
+    """Generate summary report content"""
+    try:
+        # Basic statistics
+        total_land_holders = LandHolder.objects.count()
+        total_parcels = LandParcel.objects.count()
+        total_cultivated_area = LandParcel.objects.aggregate(Sum('cultivated_area'))['cultivated_area__sum'] or 0
+        total_revenue = CroppingPattern.objects.aggregate(Sum('revenue'))['revenue__sum'] or 0
+        
+        story.append(Paragraph("Executive Summary", heading_style))
+        
+        summary_data = [
+            ["Metric", "Value"],
+            ["Total Land Holders", f"{total_land_holders:,}"],
+            ["Total Land Parcels", f"{total_parcels:,}"],
+            ["Total Cultivated Area", f"{total_cultivated_area:,.2f} hectares"],
+            ["Total Revenue Generated", f"₹{total_revenue:,.2f}"],
+        ]
+        
+        table = Table(summary_data, colWidths=[3*inch, 3*inch])
+        table.setStyle(_table_style(12, header_padding=12))
+        
+        story.append(table)
+        story.append(Spacer(1, 20))
+        
+    except Exception as e:
+        story.append(Paragraph(f"Error generating summary: {str(e)}", normal_style))
+    
+    return story
+
+def _generate_land_analysis_report(story, styles, heading_style, normal_style):
+    """Generate land analysis report content"""
+    try:
+        story.append(Paragraph("Land Holding Analysis", heading_style))
+        
+        # Land holding by type
+        land_analysis = LandHolder.objects.values('ownership_type').annotate(
+            count=Count('id'),
+            total_land=Sum('parcels__total_area')
+        )
+        
+        land_data = [["Ownership Type", "Count", "Total Land Area (hectares)"]]
+        for item in land_analysis.iterator(chunk_size=REPORT_CHUNK_SIZE):
+            land_data.append([
+                item['ownership_type'],
+                str(item['count']),
+                f"{item['total_land'] or 0:,.2f}"
+            ])
+        
+        # Rows beyond the header mean the query returned data
+        if len(land_data) > 1:
+            table = LongTable(land_data, colWidths=[2*inch, 1.5*inch, 2.5*inch], repeatRows=1)
+            table.setStyle(_table_style(10))
+            
+            story.append(table)
+        else:
+            story.append(Paragraph("No land holding data available.", normal_style))
+            
+        story.append(Spacer(1, 20))
+        
+    except Exception as e:
+        story.append(Paragraph(f"Error generating land analysis: {str(e)}", normal_style))
+    
+    return story
+
+def _generate_crop_analysis_report(story, styles, heading_style, normal_style):
+    """Generate crop analysis report content"""
+    try:
+        story.append(Paragraph("Crop Productivity Analysis", heading_style))
+        
+        # Top crops by revenue
+        crop_analysis = CroppingPattern.objects.values('crop_id').annotate(
+            total_area=Sum('area_allocated'),
+            total_yield=Sum('yield_amount'),
+            total_revenue=Sum('revenue')
+        ).order_by('-total_revenue')[:10]
+        
+        crop_names = get_crop_names()
+        crop_data = [["Crop Name", "Area (hectares)", "Total Yield", "Revenue (₹)"]]
+        for item in crop_analysis.iterator(chunk_size=REPORT_CHUNK_SIZE):
+            crop_data.append([
+                crop_names.get(item['crop_id']) or 'Unknown',
+                f"{item['total_area'] or 0:,.2f}",
+                f"{item['total_yield'] or 0:,.2f}",
+                f"₹{item['total_revenue'] or 0:,.2f}"
+            ])
+        
+        if len(crop_data) > 1:
+            table = LongTable(crop_data, colWidths=[1.5*inch, 1.5*inch, 1.5*inch, 1.5*inch], repeatRows=1)
+            table.setStyle(_table_style(9))
+            
+            story.append(table)
+        else:
+            story.append(Paragraph("No crop data available.", normal_style))
+            
+        story.append(Spacer(1, 20))
+        
+    except Exception as e:
+        story.append(Paragraph(f"Error generating crop analysis: {str(e)}", normal_style))
+    
+    return story
+
+def _generate_irrigation_analysis_report(story, styles, heading_style, normal_style):
+    """Generate irrigation analysis report content"""
+    try:
+        story.append(Paragraph("Irrigation System Analysis", heading_style))
+        
+        # Irrigation system efficiency
+        irrigation_analysis = IrrigationSystem.objects.values('system_type').annotate(
+            count=Count('id'),
+            avg_efficiency=Avg('efficiency_rating'),
+            avg_water_usage=Avg('annual_water_usage')
+        )
+        
+        irrigation_data = [["System Type", "Count", "Avg Efficiency", "Avg Water Usage"]]
+        for item in irrigation_analysis.iterator(chunk_size=REPORT_CHUNK_SIZE):
+            irrigation_data.append([
+                item['system_type'],
+                str(item['count']),
+                f"{item['avg_efficiency'] or 0:.1f}%",
+                f"{item['avg_water_usage'] or 0:,.0f} liters"
+            ])
+        
+        if len(irrigation_data) > 1:
+            table = LongTable(irrigation_data, colWidths=[1.5*inch, 1*inch, 1.5*inch, 1.5*inch], repeatRows=1)
+            table.setStyle(_table_style(9))
+            
+            story.append(table)
+        else:
+            story.append(Paragraph("No irrigation data available.", normal_style))
+            
+        story.append(Spacer(1, 20))
+        
+    except Exception as e:
+        story.append(Paragraph(f"Error generating irrigation analysis: {str(e)}", normal_style))
+    
+    return story
+
+def _generate_comprehensive_report(story, styles, heading_style, normal_style):
+    """Generate comprehensive report content"""
+    try:
+        # Include all report types
+        story = _generate_summary_report(story, styles, heading_style, normal_style)
+        story = _generate_land_analysis_report(story, styles, heading_style, normal_style)
+        story = _generate_crop_analysis_report(story, styles, heading_style, normal_style)
+        story = _generate_irrigation_analysis_report(story, styles, heading_style, normal_style)
+        
+        # Add recommendations
+        story.append(Paragraph("Recommendations", heading_style))
+        story.extend(_recommendations(normal_style))
+            
+    except Exception as e:
+        story.append(Paragraph(f"Error generating comprehensive report: {str(e)}", normal_style))
+    
+    return story
+
+@lru_cache(maxsize=None)
+def _parcel_title_style():
+    """Title style of the single parcel report, built on the shared sample stylesheet"""
+    styles = _report_styles()[0]
+    return ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=16,
+        spaceAfter=30,
+        textColor='#2E7D32',
+        alignment=1
+    )
+
+def build_parcel_report(buffer, parcel):
+    """Write the PDF report for a single land parcel into buffer"""
+    doc = SimpleDocTemplate(buffer, pagesize=A4)
+    story = []
+    
+    story.append(Paragraph(f"Land Parcel Report - {parcel.parcel_id}", _parcel_title_style()))
+    story.append(Spacer(1, 20))
+    
+    # Add parcel details
+    parcel_data = [
+        ["Parcel ID", parcel.parcel_id],
+        ["Total Area", f"{parcel.total_area} hectares"],
+        ["Cultivated Area", f"{parcel.cultivated_area} hectares"],
+        ["Soil Type", parcel.get_soil_type_display()],
+        ["Land Holder", parcel.land_holder.name],
+        ["Region", parcel.land_holder.region.name if parcel.land_holder.region else 'N/A'],
+    ]
+    
+    table = Table(parcel_data, colWidths=[2*inch, 4*inch])
+    table.setStyle(_table_style(12, align='LEFT'))
+    
+    story.append(table)
+    doc.build(story)
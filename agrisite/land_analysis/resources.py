@@ -0,0 +1,111 @@
+from django.core.exceptions import ValidationError
+from import_export import fields, resources, widgets
+from import_export.instance_loaders import CachedInstanceLoader
+from .models import *
+from .signals import clear_cached_stats
+
+class CachedForeignKeyWidget(widgets.ForeignKeyWidget):
+    """ForeignKeyWidget that resolves rows from a lookup preloaded once per import"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lookup = None
+
+    def prime(self, values):
+        """Load every related object referenced by the dataset in one query"""
+        opts = self.model._meta
+        to_python = (opts.pk if self.field == 'pk' else opts.get_field(self.field)).to_python
+        keys = set()
+        for value in values:
+            if value in (None, ''):
+                continue
+            try:
+                keys.add(to_python(value))
+            except ValidationError:
+                # Malformed keys are left for clean() to report against their own row
+                continue
+        queryset = self.model.objects.filter(**{f'{self.field}__in': keys})
+        self._lookup = {str(getattr(obj, self.field)): obj for obj in queryset}
+
+    def clear(self):
+        self._lookup = None
+
+    def clean(self, value, row=None, **kwargs):
+        if self._lookup is not None and value not in (None, ''):
+            obj = self._lookup.get(str(value))
+            if obj is not None:
+                return obj
+        # Not primed or not preloaded: fall back to the regular lookup and its errors
+        return super().clean(value, row, **kwargs)
+
+def cached_fk_field(name, model):
+    return fields.Field(attribute=name, column_name=name, widget=CachedForeignKeyWidget(model))
+
+class BulkModelResource(resources.ModelResource):
+    """Base resource that imports rows with bulk_create/bulk_update in batches"""
+
+    class Meta:
+        use_bulk = True
+        batch_size = 1000
+        skip_diff = True
+        instance_loader_class = CachedInstanceLoader
+
+    def _cached_fk_fields(self):
+        return [field for field in self.get_import_fields() if isinstance(field.widget, CachedForeignKeyWidget)]
+
+    def before_import(self, dataset, **kwargs):
+        super().before_import(dataset, **kwargs)
+        # Resolve foreign keys once per import instead of one SELECT per row
+        for field in self._cached_fk_fields():
+            if field.column_name in dataset.headers:
+                field.widget.prime(dataset[field.column_name])
+
+    def after_import(self, dataset, result, **kwargs):
+        super().after_import(dataset, result, **kwargs)
+        for field in self._cached_fk_fields():
+            field.widget.clear()
+        # The admin's preview step is a dry run and writes nothing
+        if kwargs.get('dry_run'):
+            return
+        # Bulk writes bypass post_save/post_delete, so drop cached stats here
+        clear_cached_stats()
+        DashboardSummary.refresh()
+
+class RegionResource(BulkModelResource):
+    class Meta:
+        model = Region
+
+class LandHolderResource(BulkModelResource):
+    region = cached_fk_field('region', Region)
+
+    class Meta:
+        model = LandHolder
+
+class LandParcelResource(BulkModelResource):
+    land_holder = cached_fk_field('land_holder', LandHolder)
+
+    class Meta:
+        model = LandParcel
+
+class IrrigationSystemResource(BulkModelResource):
+    land_parcel = cached_fk_field('land_parcel', LandParcel)
+
+    class Meta:
+        model = IrrigationSystem
+
+class CropResource(BulkModelResource):
+    class Meta:
+        model = Crop
+
+class CroppingPatternResource(BulkModelResource):
+    land_parcel = cached_fk_field('land_parcel', LandParcel)
+    crop = cached_fk_field('crop', Crop)
+
+    class Meta:
+        model = CroppingPattern
+
+class LandAnalysisResource(BulkModelResource):
+    land_parcel = cached_fk_field('land_parcel', LandParcel)
+
+    class Meta:
+        model = LandAnalysis
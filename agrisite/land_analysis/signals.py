@@ -0,0 +1,70 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Region, LandHolder, LandParcel, IrrigationSystem, Crop, CroppingPattern, LandAnalysis, DashboardSummary
+from .context_processors import GLOBAL_STATS_CACHE_KEY
+from .utils import CHART_DATA_CACHE_KEY, CROP_NAMES_CACHE_KEY, LAND_UTILIZATION_CACHE_KEY, PAGE_STATS_CACHE_KEYS
+
+def clear_cached_stats():
+    """Drop every cached statistic, for bulk writes that bypass model signals"""
+    cache.delete_many([
+        GLOBAL_STATS_CACHE_KEY,
+        CHART_DATA_CACHE_KEY,
+        CROP_NAMES_CACHE_KEY,
+        LAND_UTILIZATION_CACHE_KEY,
+        *PAGE_STATS_CACHE_KEYS,
+    ])
+
+@receiver([post_save, post_delete], sender=LandHolder)
+@receiver([post_save, post_delete], sender=LandParcel)
+@receiver([post_save, post_delete], sender=CroppingPattern)
+def invalidate_global_stats(sender, **kwargs):
+    """Drop the cached global statistics whenever the underlying data changes"""
+    cache.delete(GLOBAL_STATS_CACHE_KEY)
+
+@receiver([post_save, post_delete], sender=LandHolder)
+@receiver([post_save, post_delete], sender=LandParcel)
+@receiver([post_save, post_delete], sender=IrrigationSystem)
+@receiver([post_save, post_delete], sender=Crop)
+@receiver([post_save, post_delete], sender=CroppingPattern)
+def invalidate_chart_data(sender, **kwargs):
+    """Drop the cached chart data whenever the underlying data changes"""
+    cache.delete(CHART_DATA_CACHE_KEY)
+
+@receiver([post_save, post_delete], sender=LandParcel)
+def invalidate_land_utilization(sender, **kwargs):
+    """Drop the cached land utilization metrics whenever parcels change"""
+    cache.delete(LAND_UTILIZATION_CACHE_KEY)
+
+@receiver([post_save, post_delete], sender=Crop)
+def invalidate_crop_names(sender, **kwargs):
+    """Drop the cached crop id to name mapping whenever crops change"""
+    cache.delete(CROP_NAMES_CACHE_KEY)
+
+@receiver([post_save, post_delete], sender=Region)
+@receiver([post_save, post_delete], sender=LandHolder)
+@receiver([post_save, post_delete], sender=LandParcel)
+@receiver([post_save, post_delete], sender=IrrigationSystem)
+@receiver([post_save, post_delete], sender=Crop)
+@receiver([post_save, post_delete], sender=CroppingPattern)
+@receiver([post_save, post_delete], sender=LandAnalysis)
+def invalidate_page_stats(sender, **kwargs):
+    """Drop the cached home, dashboard and analysis page aggregates whenever the underlying data changes"""
+    cache.delete_many(PAGE_STATS_CACHE_KEYS)
+
+@receiver([post_save, post_delete], sender=LandParcel)
+@receiver([post_save, post_delete], sender=LandAnalysis)
+def refresh_dashboard_summary(sender, using=None, **kwargs):
+    """Recompute the dashboard summary row once the change is committed"""
+    connection = transaction.get_connection(using)
+    connection.dashboard_summary_stale = True
+
+    def refresh():
+        # Every write in the transaction queues this, but only the first call after
+        # the commit recomputes; a bulk delete of N rows refreshes once, not N times
+        if connection.dashboard_summary_stale:
+            connection.dashboard_summary_stale = False
+            DashboardSummary.refresh()
+
+    transaction.on_commit(refresh, using=using)
@@ -1,3 +1,526 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import shutil
+import tempfile
+import zipfile
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+import tablib
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import Avg, Count, Sum
+from django.http import HttpResponse
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .forms import CustomUserCreationForm
+from .models import (
+    Region, LandHolder, LandParcel, IrrigationSystem, Crop, CroppingPattern, LandAnalysis, DashboardSummary
+)
+from .resources import LandParcelResource
+from . import exports, views
+from .context_processors import _fetch_global_stats
+from .exports import _report_summary
+from .views import _analysis_data, _analysis_reports_data, _crop_breakdown, _land_stats_data
+
+
+class SampleDataMixin:
+    """A small farm dataset shared by the tests"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.north = Region.objects.create(name='North', code='N', total_area=Decimal('1000'))
+        cls.south = Region.objects.create(name='South', code='S', total_area=Decimal('500'))
+        cls.wheat = Crop.objects.create(
+            name='Wheat', crop_type='cereal', season='rabi', growth_period=120, water_requirement=Decimal('450')
+        )
+        cls.rice = Crop.objects.create(
+            name='Rice', crop_type='cereal', season='kharif', growth_period=130, water_requirement=Decimal('900')
+        )
+        for i in range(6):
+            holder = LandHolder.objects.create(
+                name=f'Holder {i}',
+                ownership_type=['individual', 'corporate'][i % 2],
+                region=[cls.north, cls.south][i % 2],
+            )
+            parcel = LandParcel.objects.create(
+                land_holder=holder,
+                parcel_id=f'P{i}',
+                total_area=Decimal('10.50') + i,
+                cultivated_area=Decimal('5.25') + i,
+                soil_type=['clay', 'loamy', 'sandy'][i % 3],
+            )
+            IrrigationSystem.objects.create(
+                land_parcel=parcel,
+                system_type=['drip', 'flood'][i % 2],
+                water_source='well',
+                efficiency_rating=50 + i,
+                annual_water_usage=Decimal('100.00') * (i + 1),
+            )
+            for year in (2022, 2023):
+                CroppingPattern.objects.create(
+                    land_parcel=parcel,
+                    crop=[cls.wheat, cls.rice][i % 2],
+                    year=year,
+                    season='rabi',
+                    area_allocated=Decimal('3.00'),
+                    yield_amount=Decimal('9.00') + i,
+                    revenue=Decimal('1000.00') * (i + 1),
+                )
+            LandAnalysis.objects.create(
+                land_parcel=parcel, soil_health_index=50, water_availability=60, productivity_score=70 + i
+            )
+        # A holder without parcels still counts towards its ownership type
+        LandHolder.objects.create(name='Landless', ownership_type='cooperative', region=cls.north)
+
+
+class AnalysisReportsDataTests(SampleDataMixin, TestCase):
+    """The single UNION ALL query must match the per-section ORM aggregates it replaced"""
+
+    def setUp(self):
+        self.data = _analysis_reports_data()
+
+    def test_land_holding_analysis(self):
+        expected = LandHolder.objects.values('ownership_type').annotate(
+            count=Count('id'),
+            total_land=Sum('parcels__total_area'),
+            avg_parcels=Avg('parcels__id', distinct=True)
+        )
+        rows = {row['ownership_type']: row for row in self.data['land_holding_analysis']}
+        self.assertEqual(len(rows), len(expected))
+        for row in expected:
+            actual = rows[row['ownership_type']]
+            self.assertEqual(actual['count'], row['count'])
+            self.assertEqual(actual['total_land'], row['total_land'])
+            self.assertAlmostEqual(actual['avg_parcels'] or 0, row['avg_parcels'] or 0)
+
+    def test_irrigation_efficiency(self):
+        expected = IrrigationSystem.objects.values('system_type').annotate(
+            avg_efficiency=Avg('efficiency_rating'),
+            avg_water_usage=Avg('annual_water_usage')
+        )
+        rows = {row['system_type']: row for row in self.data['irrigation_efficiency']}
+        self.assertEqual(len(rows), len(expected))
+        for row in expected:
+            actual = rows[row['system_type']]
+            self.assertAlmostEqual(actual['avg_efficiency'], row['avg_efficiency'])
+            self.assertEqual(actual['avg_water_usage'], row['avg_water_usage'])
+
+    def test_crop_productivity(self):
+        expected = list(CroppingPattern.objects.values(
+            'crop__name', 'crop__crop_type', 'crop__id'
+        ).annotate(
+            total_area=Sum('area_allocated'),
+            avg_yield=Avg('yield_amount'),
+            total_revenue=Sum('revenue')
+        ).order_by('-total_revenue'))
+        self.assertEqual(self.data['crop_productivity'], expected)
+
+    def test_production_trend(self):
+        expected = list(CroppingPattern.objects.values('year').annotate(
+            total_yield=Sum('yield_amount'),
+            total_revenue=Sum('revenue')
+        ).order_by('year'))
+        self.assertEqual(self.data['production_trend'], expected)
+
+
+
+class LandStatsDataTests(SampleDataMixin, TestCase):
+    """The single UNION ALL query behind api_land_stats must match the per-grouping ORM queries"""
+
+    def assertMatchesOrm(self, region_id=None, soil_type=None):
+        parcels = LandParcel.objects.all()
+        irrigation = IrrigationSystem.objects.all()
+        patterns = CroppingPattern.objects.all()
+        if region_id is not None:
+            parcels = parcels.filter(land_holder__region_id=region_id)
+            irrigation = irrigation.filter(land_parcel__land_holder__region_id=region_id)
+            patterns = patterns.filter(land_parcel__land_holder__region_id=region_id)
+        if soil_type:
+            parcels = parcels.filter(soil_type=soil_type)
+            irrigation = irrigation.filter(land_parcel__soil_type=soil_type)
+            patterns = patterns.filter(land_parcel__soil_type=soil_type)
+        expected = {
+            'soil_distribution': parcels.values('soil_type').annotate(
+                count=Count('id'), total_area=Sum('total_area')
+            ),
+            'irrigation_distribution': irrigation.values('system_type').annotate(
+                count=Count('id'), avg_efficiency=Avg('efficiency_rating')
+            ),
+            'crop_distribution': patterns.values('crop__crop_type').annotate(
+                total_area=Sum('area_allocated'), avg_yield=Avg('yield_amount')
+            ),
+            'region_stats': LandParcel.objects.values('land_holder__region__name').annotate(
+                parcel_count=Count('id'), total_area=Sum('total_area'), cultivated_area=Sum('cultivated_area')
+            ),
+        }
+        with self.assertNumQueries(1):
+            data = _land_stats_data(region_id, soil_type)
+        self.assertEqual(set(data), set(expected))
+        for name, queryset in expected.items():
+            key = next(iter(queryset.query.values_select))
+            rows = sorted(queryset, key=lambda row: row[key])
+            self.assertEqual(sorted(data[name], key=lambda row: row[key]), rows, name)
+
+    def test_unfiltered(self):
+        self.assertMatchesOrm()
+
+    def test_region(self):
+        self.assertMatchesOrm(region_id=self.north.pk)
+
+    def test_soil_type(self):
+        self.assertMatchesOrm(soil_type='clay')
+
+    def test_region_and_soil_type(self):
+        self.assertMatchesOrm(region_id=self.south.pk, soil_type='loamy')
+
+
+class CropBreakdownTests(SampleDataMixin, TestCase):
+    """The single UNION ALL query behind crop_analysis must match the per-grouping ORM queries"""
+
+    def test_matches_orm(self):
+        patterns = CroppingPattern.objects.filter(crop=self.wheat)
+        expected = [
+            patterns.values('land_parcel__land_holder__region__name', 'land_parcel__land_holder__region__id').annotate(
+                area=Sum('area_allocated'), yield_amount=Sum('yield_amount'), revenue=Sum('revenue')
+            ),
+            patterns.values('season').annotate(
+                avg_yield=Avg('yield_amount'), avg_revenue=Avg('revenue'), total_area=Sum('area_allocated')
+            ),
+            patterns.values('year').annotate(
+                total_yield=Sum('yield_amount'), total_revenue=Sum('revenue'), total_area=Sum('area_allocated')
+            ),
+        ]
+        with self.assertNumQueries(1):
+            groupings = _crop_breakdown(self.wheat.pk)
+        for rows, queryset in zip(groupings, expected):
+            key = next(iter(queryset.query.values_select))
+            self.assertEqual(sorted(rows, key=lambda row: row[key]), sorted(queryset, key=lambda row: row[key]))
+
+    def test_crop_without_patterns(self):
+        crop = Crop.objects.create(
+            name='Millet', crop_type='cereal', season='kharif', growth_period=90, water_requirement=Decimal('350')
+        )
+        self.assertEqual(_crop_breakdown(crop.pk), ([], [], []))
+
+class TableTotalsTests(SampleDataMixin, TestCase):
+    """The scalar-subquery summaries must match the equivalent ORM aggregates"""
+
+    def test_report_summary(self):
+        self.assertEqual(_report_summary(), {
+            'total_land_holders': LandHolder.objects.count(),
+            'total_parcels': LandParcel.objects.count(),
+            'total_cultivated_area': LandParcel.objects.aggregate(total=Sum('cultivated_area'))['total'],
+            'total_revenue': CroppingPattern.objects.aggregate(total=Sum('revenue'))['total'],
+        })
+
+    def test_global_stats(self):
+        self.assertEqual(_fetch_global_stats(), {
+            'total_land_holders': LandHolder.objects.count(),
+            'total_parcels': LandParcel.objects.count(),
+            'total_cultivated_area': LandParcel.objects.aggregate(total=Sum('cultivated_area'))['total'],
+            'total_crops_planted': CroppingPattern.objects.count(),
+        })
+
+    def test_empty_tables(self):
+        CroppingPattern.objects.all().delete()
+        LandParcel.objects.all().delete()
+        summary = _report_summary()
+        self.assertEqual(summary['total_cultivated_area'], 0)
+        self.assertEqual(summary['total_revenue'], 0)
+
+
+class ApiEtagTests(SampleDataMixin, TestCase):
+    """The statistics API answers revalidations with a 304 until its payload changes"""
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(User.objects.create_user('analyst', password='secret'))
+        self.url = reverse('api_land_stats')
+
+    def test_unchanged_payload_is_not_modified(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_changed_payload_gets_new_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            CroppingPattern.objects.create(
+                land_parcel=LandParcel.objects.first(), crop=self.rice, year=2024, season='kharif',
+                area_allocated=Decimal('2.00'), yield_amount=Decimal('4.00'), revenue=Decimal('500.00')
+            )
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_filters_change_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, {'soil_type': 'clay'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_error_has_no_etag(self):
+        response = self.client.get(self.url, {'region': 'north'})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.has_header('ETag'))
+
+
+class ApiAnalysisDataTests(SampleDataMixin, TestCase):
+    """Each analysis type returns only its own sections"""
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(User.objects.create_user('analyst', password='secret'))
+        self.url = reverse('api_analysis_data')
+
+    def test_comprehensive(self):
+        data = self.client.get(self.url).json()
+        self.assertEqual(data['status'], 'success')
+        self.assertEqual(
+            set(data) - {'status'},
+            {'land_analysis', 'irrigation_analysis', 'crop_analysis', 'production_trends'}
+        )
+        self.assertEqual([row['year'] for row in data['production_trends']], [2022, 2023])
+
+    def test_single_type(self):
+        data = self.client.get(self.url, {'type': 'irrigation'}).json()
+        self.assertEqual(set(data), {'irrigation_analysis', 'status'})
+        counts = {row['system_type']: row['count'] for row in data['irrigation_analysis']}
+        self.assertEqual(counts, {'drip': 3, 'flood': 3})
+
+    def test_requires_login(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(self.url).status_code, 302)
+
+    def test_matches_orm(self):
+        expected = {
+            'land_analysis': LandHolder.objects.values('ownership_type').annotate(
+                count=Count('id'), total_land=Sum('parcels__total_area')
+            ),
+            'irrigation_analysis': IrrigationSystem.objects.values('system_type').annotate(
+                count=Count('id'), avg_efficiency=Avg('efficiency_rating')
+            ),
+            'crop_analysis': CroppingPattern.objects.values('crop__name').annotate(
+                total_area=Sum('area_allocated'), total_yield=Sum('yield_amount')
+            ),
+            'production_trends': CroppingPattern.objects.values('year').annotate(
+                total_yield=Sum('yield_amount'), total_revenue=Sum('revenue')
+            ).order_by('year'),
+        }
+        with self.assertNumQueries(1):
+            data = _analysis_data('comprehensive')
+        self.assertEqual(list(data), list(expected))
+        for name, queryset in expected.items():
+            key = next(iter(queryset.query.values_select))
+            self.assertEqual(
+                sorted(data[name], key=lambda row: row[key]), sorted(queryset, key=lambda row: row[key]), name
+            )
+        self.assertEqual(data['production_trends'], list(expected['production_trends']))
+
+    def test_unknown_type(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(_analysis_data('soil'), {})
+
+
+class _InlineExecutor:
+    """Runs submitted jobs straight away, so the test database stays on one thread"""
+
+    def submit(self, fn, *args):
+        fn(*args)
+
+
+class BackgroundExportTests(SampleDataMixin, TestCase):
+    """A queued export can be polled and downloaded by the user who started it only"""
+
+    def setUp(self):
+        cache.clear()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root, REDIS_URL='redis://cache')
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        executor = mock.patch.object(exports, '_job_executor', _InlineExecutor())
+        executor.start()
+        self.addCleanup(executor.stop)
+        self.owner = User.objects.create_user('owner', password='secret')
+        self.client.force_login(self.owner)
+
+    def queue(self, data_type='land_parcels', format_type='csv'):
+        response = self.client.get(
+            reverse('export_data', args=[data_type]), {'format': format_type, 'async': '1'}
+        )
+        self.assertEqual(response.status_code, 202)
+        return response.json()
+
+    def test_lifecycle(self):
+        queued = self.queue()
+        self.assertEqual(queued['status'], 'PENDING')
+        status = self.client.get(queued['status_url']).json()
+        self.assertEqual(status['status'], 'SUCCESS')
+        response = self.client.get(status['url'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        content = b''.join(response.streaming_content)
+        response.close()
+        synchronous = self.client.get(reverse('export_data', args=['land_parcels']), {'format': 'csv'})
+        self.assertEqual(content, b''.join(synchronous.streaming_content))
+
+    def test_other_user_cannot_see_job(self):
+        queued = self.queue()
+        self.client.force_login(User.objects.create_user('intruder', password='secret'))
+        self.assertEqual(self.client.get(queued['status_url']).status_code, 404)
+        self.assertEqual(
+            self.client.get(reverse('export_download', args=[queued['task_id']])).status_code, 404
+        )
+
+    def test_failure_is_logged_not_exposed(self):
+        with mock.patch.object(exports, '_write_export', side_effect=OSError('/srv/media is full')):
+            with self.assertLogs('land_analysis.exports', 'ERROR'):
+                queued = self.queue()
+        status = self.client.get(queued['status_url']).json()
+        self.assertEqual(status, {'task_id': queued['task_id'], 'status': 'FAILURE', 'error': 'Export failed'})
+        self.assertEqual(
+            self.client.get(reverse('export_download', args=[queued['task_id']])).status_code, 404
+        )
+
+    @override_settings(REDIS_URL=None)
+    def test_served_directly_without_shared_cache(self):
+        response = self.client.get(
+            reverse('export_data', args=['land_parcels']), {'format': 'csv', 'async': '1'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+
+
+class SignupFormTests(TestCase):
+    """Username and email uniqueness are both checked by the form's clean()"""
+
+    def setUp(self):
+        User.objects.create_user('farmer', email='farmer@example.com', password='secret')
+
+    def form(self, **overrides):
+        data = {
+            'username': 'grower', 'first_name': 'Asha', 'last_name': 'Rao',
+            'email': 'grower@example.com', 'password1': 'Harvest-2024!', 'password2': 'Harvest-2024!',
+        }
+        data.update(overrides)
+        return CustomUserCreationForm(data)
+
+    def test_new_user_is_valid(self):
+        self.assertTrue(self.form().is_valid())
+
+    def test_username_taken_ignoring_case(self):
+        form = self.form(username='Farmer')
+        self.assertFalse(form.is_valid())
+        self.assertEqual(list(form.errors), ['username'])
+
+    def test_email_taken(self):
+        form = self.form(email='farmer@example.com')
+        self.assertFalse(form.is_valid())
+        self.assertEqual(list(form.errors), ['email'])
+
+    def test_both_taken(self):
+        form = self.form(username='farmer', email='farmer@example.com')
+        self.assertFalse(form.is_valid())
+        self.assertEqual(set(form.errors), {'username', 'email'})
+
+
+class BulkImportTests(SampleDataMixin, TestCase):
+    """Bulk imports resolve foreign keys from the preloaded lookup and only refresh stats for real imports"""
+
+    def dataset(self, *holders):
+        dataset = tablib.Dataset(headers=['parcel_id', 'land_holder', 'total_area', 'cultivated_area', 'soil_type'])
+        for index, holder in enumerate(holders):
+            dataset.append([f'NEW{index}', holder, '12.00', '6.00', 'silt'])
+        return dataset
+
+    def test_import(self):
+        holders = list(LandHolder.objects.values_list('pk', flat=True)[:3])
+        with mock.patch.object(DashboardSummary, 'refresh') as refresh:
+            result = LandParcelResource().import_data(self.dataset(*holders))
+        self.assertFalse(result.has_errors())
+        imported = LandParcel.objects.filter(parcel_id__startswith='NEW').order_by('parcel_id')
+        self.assertEqual([parcel.land_holder_id for parcel in imported], holders)
+        refresh.assert_called_once_with()
+
+    def test_dry_run_writes_nothing(self):
+        holder = LandHolder.objects.values_list('pk', flat=True).first()
+        with mock.patch.object(DashboardSummary, 'refresh') as refresh:
+            result = LandParcelResource().import_data(self.dataset(holder), dry_run=True)
+        self.assertFalse(result.has_errors())
+        self.assertFalse(LandParcel.objects.filter(parcel_id__startswith='NEW').exists())
+        refresh.assert_not_called()
+
+    def test_unknown_foreign_key_is_a_row_error(self):
+        result = LandParcelResource().import_data(self.dataset(0), raise_errors=False)
+        self.assertTrue(result.has_errors() or result.has_validation_errors())
+        self.assertFalse(LandParcel.objects.filter(parcel_id__startswith='NEW').exists())
+
+    def test_malformed_foreign_key_is_a_row_error(self):
+        holder = LandHolder.objects.values_list('pk', flat=True).first()
+        result = LandParcelResource().import_data(self.dataset(holder, 'abc'), raise_errors=False)
+        self.assertFalse(result.base_errors)
+        self.assertEqual([(row.number, list(row.error_dict)) for row in result.invalid_rows], [(2, ['land_holder'])])
+
+
+class StreamedExportTests(SampleDataMixin, TestCase):
+    """Table exports hold the same rows in every format"""
+
+    def setUp(self):
+        self.client.force_login(User.objects.create_user('analyst', password='secret'))
+        self.fields = exports.EXPORT_SPECS['land_parcels'][1]
+        self.rows = list(LandParcel.objects.values_list(*self.fields))
+
+    def export(self, format_type):
+        return self.client.get(reverse('export_data', args=['land_parcels']), {'format': format_type})
+
+    def test_csv(self):
+        response = self.export('csv')
+        self.assertTrue(response.streaming)
+        lines = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(lines[0], list(self.fields))
+        self.assertEqual(lines[1:], [[str(value) for value in row] for row in self.rows])
+
+    def test_json(self):
+        response = self.export('json')
+        self.assertTrue(response.streaming)
+        rows = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(rows, [
+            {field: str(value) if isinstance(value, Decimal) else value for field, value in zip(self.fields, row)}
+            for row in self.rows
+        ])
+
+    def test_excel(self):
+        response = self.export('excel')
+        self.assertEqual(response.status_code, 200)
+        with zipfile.ZipFile(io.BytesIO(response.content)) as workbook:
+            sheet = workbook.read('xl/worksheets/sheet1.xml').decode()
+        self.assertIn('<dimension ref="A1:F%d"/>' % (len(self.rows) + 1), sheet)
+        for row in self.rows:
+            self.assertIn(row[0], sheet)
+
+    def test_unknown_table(self):
+        self.assertEqual(self.client.get(reverse('export_data', args=['users'])).status_code, 400)
+
+
+class RegionAnalysisTests(SampleDataMixin, TestCase):
+    """Region statistics come from one aggregate, with the cultivated share weighted by area"""
+
+    def test_region_stats(self):
+        self.client.force_login(User.objects.create_user('analyst', password='secret'))
+        with mock.patch.object(views, 'render', return_value=HttpResponse()) as render:
+            self.client.get(reverse('region_analysis', args=[self.north.pk]))
+        stats = render.call_args.args[2]['region_stats']
+
+        parcels = LandParcel.objects.filter(land_holder__region=self.north)
+        total_area = sum(parcel.total_area for parcel in parcels)
+        cultivated_area = sum(parcel.cultivated_area for parcel in parcels)
+        self.assertEqual(stats['total_parcels'], len(parcels))
+        self.assertEqual(stats['total_area'], total_area)
+        self.assertEqual(stats['avg_parcel_size'], total_area / len(parcels))
+        self.assertAlmostEqual(stats['cultivated_percentage'], float(cultivated_area * 100 / total_area))
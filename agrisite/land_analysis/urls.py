@@ -16,12 +16,17 @@ urlpatterns = [
     path('crop/<int:crop_id>/', views.crop_analysis, name='crop_analysis'),
     
     # Data Export & Download
+    path('export/status/<str:task_id>/', views.export_status, name='export_status'),
+    path('export/download/<str:task_id>/', views.export_download, name='export_download'),
     path('export/<str:data_type>/', views.export_data, name='export_data'),
     path('download/report/<str:report_type>/', views.download_analysis_report, name='download_report'),
     path('download/parcel/<int:pk>/', views.download_parcel_report, name='download_parcel_report'),
     
     # API Endpoints
     path('api/land-stats/', views.api_land_stats, name='api_land_stats'),
+    path('api/chart-data/', views.api_chart_data, name='api_chart_data'),
+    path('api/analysis-data/', views.api_analysis_data, name='api_analysis_data'),
+    path('api/dashboard-data/', views.dashboard_data_json, name='dashboard_data_json'),
     
     # User Management
     path('profile/', views.profile, name='profile'),
@@ -1,168 +1,172 @@
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import seaborn as sns
-import pandas as pd
-from io import BytesIO
-import base64
-from django.db.models import Count, Sum, Avg
-from .models import LandParcel, IrrigationSystem, CroppingPattern
+import decimal
+import hashlib
+import uuid
+import orjson
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError, connection
+from django.http import HttpResponse
+from django.db.models import Count, Sum, F, FloatField
+from django.db.models.functions import Cast, NullIf
+from .models import LandParcel, IrrigationSystem, Crop, CroppingPattern
 
-def generate_land_analysis_charts():
-    """Generate various charts for land analysis"""
-    charts = {}
-    
-    try:
-        # Chart 1: Land Distribution by Soil Type
-        soil_data = LandParcel.objects.values('soil_type').annotate(
-            count=Count('id'),
-            total_area=Sum('total_area')
-        )
-        
-        if soil_data:
-            df_soil = pd.DataFrame(list(soil_data))
-            if not df_soil.empty:
-                plt.figure(figsize=(10, 6))
-                plt.pie(df_soil['total_area'], labels=df_soil['soil_type'], autopct='%1.1f%%', startangle=90)
-                plt.title('Land Distribution by Soil Type', fontsize=14, fontweight='bold')
-                plt.axis('equal')
-                charts['soil_distribution'] = get_chart_image()
-                plt.close()
+CHART_DATA_CACHE_KEY = 'chart_data_v1'
+CHART_DATA_TIMEOUT = 300  # seconds
+LAND_UTILIZATION_CACHE_KEY = 'land_util_v1'
+LAND_UTILIZATION_TIMEOUT = 60  # seconds
+CROP_NAMES_CACHE_KEY = 'crop_names'
+CROP_NAMES_TIMEOUT = 3600  # seconds
+PAGE_STATS_TIMEOUT = 300  # seconds
+SUMMARY_STATS_CACHE_KEY = 'summary_stats'
+RECENT_YEARS_CACHE_KEY = 'recent_years'
+DASHBOARD_REGION_CACHE_KEY = 'dash:region_data'
+DASHBOARD_IRRIGATION_CACHE_KEY = 'dash:irrigation_data'
+DASHBOARD_CROP_CACHE_KEY = 'dash:crop_data'
+ANALYSIS_REPORTS_CACHE_KEY = 'analysis:reports'
+DASHBOARD_JSON_CACHE_KEY = 'dash:json'
+COMPREHENSIVE_REPORT_CACHE_KEY = 'report:comprehensive'
+# Signals drop the report when data changes, but only in the cache of the process that
+# handled the write; keep it for a day only when that cache is shared between workers
+COMPREHENSIVE_REPORT_TIMEOUT = 24 * 3600 if settings.REDIS_URL else 300  # seconds
+API_STATS_VERSION_KEY = 'api_stats_version'
+API_STATS_TIMEOUT = 120  # seconds
+PAGE_STATS_CACHE_KEYS = [
+    SUMMARY_STATS_CACHE_KEY,
+    RECENT_YEARS_CACHE_KEY,
+    DASHBOARD_REGION_CACHE_KEY,
+    DASHBOARD_IRRIGATION_CACHE_KEY,
+    DASHBOARD_CROP_CACHE_KEY,
+    ANALYSIS_REPORTS_CACHE_KEY,
+    DASHBOARD_JSON_CACHE_KEY,
+    COMPREHENSIVE_REPORT_CACHE_KEY,
+    # Dropping the version orphans every filtered API payload at once
+    API_STATS_VERSION_KEY,
+]
 
-        # Chart 2: Irrigation System Distribution
-        irrigation_data = IrrigationSystem.objects.values('system_type').annotate(
-            count=Count('id')
-        )
-        
-        if irrigation_data:
-            df_irrigation = pd.DataFrame(list(irrigation_data))
-            if not df_irrigation.empty:
-                plt.figure(figsize=(12, 6))
-                sns.barplot(data=df_irrigation, x='system_type', y='count', palette='viridis')
-                plt.title('Irrigation System Distribution', fontsize=14, fontweight='bold')
-                plt.xlabel('System Type')
-                plt.ylabel('Count')
-                plt.xticks(rotation=45)
-                plt.tight_layout()
-                charts['irrigation_distribution'] = get_chart_image()
-                plt.close()
+# orjson handles the builtin types itself and hands Decimals and the like to Django's encoder
+_json_default = DjangoJSONEncoder().default
 
-        # Chart 3: Crop Productivity
-        crop_data = CroppingPattern.objects.values('crop__name').annotate(
-            total_yield=Sum('yield_amount'),
-            total_area=Sum('area_allocated')
-        )[:10]
-        
-        if crop_data:
-            df_crop = pd.DataFrame(list(crop_data))
-            if not df_crop.empty and (df_crop['total_area'] > 0).any():
-                df_crop['productivity'] = df_crop['total_yield'] / df_crop['total_area']
-                
-                plt.figure(figsize=(12, 6))
-                sns.barplot(data=df_crop, x='crop__name', y='productivity', palette='coolwarm')
-                plt.title('Crop Productivity (Yield per Hectare)', fontsize=14, fontweight='bold')
-                plt.xlabel('Crop')
-                plt.ylabel('Productivity (tons/hectare)')
-                plt.xticks(rotation=45)
-                plt.tight_layout()
-                charts['crop_productivity'] = get_chart_image()
-                plt.close()
+def dumps_json(data):
+    """Encode data as JSON bytes with orjson"""
+    return orjson.dumps(data, default=_json_default)
 
-        # Chart 4: Year-wise Production Trend
-        trend_data = CroppingPattern.objects.values('year').annotate(
-            total_yield=Sum('yield_amount')
-        ).order_by('year')
-        
-        if trend_data:
-            df_trend = pd.DataFrame(list(trend_data))
-            if not df_trend.empty:
-                plt.figure(figsize=(12, 6))
-                plt.plot(df_trend['year'], df_trend['total_yield'], marker='o', linewidth=2, markersize=8)
-                plt.title('Year-wise Production Trend', fontsize=14, fontweight='bold')
-                plt.xlabel('Year')
-                plt.ylabel('Total Yield (tons)')
-                plt.grid(True, alpha=0.3)
-                plt.tight_layout()
-                charts['production_trend'] = get_chart_image()
-                plt.close()
+class OrjsonResponse(HttpResponse):
+    """JsonResponse counterpart that encodes with orjson"""
+    def __init__(self, data, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(dumps_json(data), **kwargs)
+
+_create_decimal = decimal.Context(prec=15).create_decimal_from_float
+
+def raw_decimal(value):
+    """Convert a raw-SQL DecimalField aggregate the way the ORM would (SQLite hands back floats)"""
+    if isinstance(value, (int, float)):
+        return _create_decimal(float(value))
+    return value
+
+def fetch_table_totals(**totals):
+    """Compute whole-table aggregates as scalar subqueries of a single SELECT
+
+    Each keyword maps a result name to (function, model, field name), with a field
+    of None for COUNT(*). DecimalField results come back as Decimals, as from the ORM.
+    """
+    qn = connection.ops.quote_name
+    subqueries = []
+    decimal_names = set()
+    for name, (function, model, field_name) in totals.items():
+        if field_name is None:
+            column = '*'
+        else:
+            field = model._meta.get_field(field_name)
+            column = qn(field.column)
+            if field.get_internal_type() == 'DecimalField':
+                decimal_names.add(name)
+        subqueries.append(f"(SELECT {function}({column}) FROM {qn(model._meta.db_table)})")
+    
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT {', '.join(subqueries)}")
+        row = cursor.fetchone()
+    return {
+        name: raw_decimal(value) if name in decimal_names else value
+        for name, value in zip(totals, row)
+    }
+
+def _float_sum(field):
+    """Sum a DecimalField as a float in the database, since charts don't need Decimal precision"""
+    return Sum(Cast(field, FloatField()))
 
-        # Chart 5: Land Holding by Ownership Type
-        ownership_data = LandParcel.objects.values(
+def _fetch_chart_data():
+    """Fetch the aggregated rows behind every land analysis chart"""
+    return {
+        'soil_distribution': list(LandParcel.objects.values('soil_type').annotate(
+            count=Count('id'),
+            total_area=_float_sum('total_area')
+        )),
+        'irrigation_distribution': list(IrrigationSystem.objects.values('system_type').annotate(
+            count=Count('id')
+        )),
+        'crop_productivity': list(CroppingPattern.objects.values('crop__name').annotate(
+            total_yield=_float_sum('yield_amount'),
+            total_area=_float_sum('area_allocated'),
+            # NULLIF turns a zero area into a NULL productivity instead of an error
+            productivity=_float_sum('yield_amount') / NullIf(_float_sum('area_allocated'), 0.0)
+        ).order_by(F('productivity').desc(nulls_last=True))[:10]),
+        'production_trend': list(CroppingPattern.objects.values('year').annotate(
+            total_yield=_float_sum('yield_amount')
+        ).order_by('year')),
+        'ownership_distribution': list(LandParcel.objects.values(
             'land_holder__ownership_type'
         ).annotate(
-            total_area=Sum('total_area'),
+            total_area=_float_sum('total_area'),
             parcel_count=Count('id')
-        )
-        
-        if ownership_data:
-            df_ownership = pd.DataFrame(list(ownership_data))
-            if not df_ownership.empty:
-                plt.figure(figsize=(10, 6))
-                plt.pie(df_ownership['total_area'], labels=df_ownership['land_holder__ownership_type'], 
-                        autopct='%1.1f%%', startangle=90, colors=sns.color_palette('pastel'))
-                plt.title('Land Distribution by Ownership Type', fontsize=14, fontweight='bold')
-                plt.axis('equal')
-                charts['ownership_distribution'] = get_chart_image()
-                plt.close()
+        )),
+    }
 
-    except Exception as e:
-        # Return empty charts if there's an error
-        print(f"Error generating charts: {e}")
-        charts = {}
+def get_crop_names():
+    """Map crop ids to names, so aggregates can group on crop_id without joining Crop"""
+    return cache.get_or_set(
+        CROP_NAMES_CACHE_KEY,
+        lambda: dict(Crop.objects.values_list('id', 'name')),
+        CROP_NAMES_TIMEOUT
+    )
 
-    return charts
+def api_stats_cache_key(prefix, *params):
+    """Cache key for a filtered API payload, tied to the current data version"""
+    version = cache.get_or_set(API_STATS_VERSION_KEY, lambda: uuid.uuid4().hex, None)
+    digest = hashlib.blake2b(repr(params).encode(), digest_size=16).hexdigest()
+    return f"{prefix}:{version}:{digest}"
 
-def get_chart_image():
-    """Convert matplotlib chart to base64 image"""
-    buffer = BytesIO()
-    plt.savefig(buffer, format='png', bbox_inches='tight', dpi=100, facecolor='white')
-    buffer.seek(0)
-    image_png = buffer.getvalue()
-    buffer.close()
-    
-    graphic = base64.b64encode(image_png).decode('utf-8')
-    return graphic
+def get_chart_data():
+    """Return chart data for client-side rendering, cached until the data changes"""
+    return cache.get_or_set(CHART_DATA_CACHE_KEY, _fetch_chart_data, CHART_DATA_TIMEOUT)
 
-def generate_simple_chart(data, chart_type='bar', title='Chart', xlabel='X', ylabel='Y'):
-    """Generate a simple chart with given data"""
-    plt.figure(figsize=(10, 6))
-    
-    if chart_type == 'bar':
-        plt.bar(range(len(data)), list(data.values()))
-        plt.xticks(range(len(data)), list(data.keys()), rotation=45)
-    elif chart_type == 'line':
-        plt.plot(list(data.keys()), list(data.values()), marker='o')
-    elif chart_type == 'pie':
-        plt.pie(list(data.values()), labels=list(data.keys()), autopct='%1.1f%%')
+def _compute_land_utilization():
+    """Compute land utilization metrics from a single aggregate query"""
+    totals = LandParcel.objects.aggregate(
+        total=Sum('total_area'),
+        cult=Sum('cultivated_area')
+    )
+    total_land = totals['total'] or 0
+    cultivated_land = totals['cult'] or 0
     
-    plt.title(title)
-    plt.xlabel(xlabel)
-    plt.ylabel(ylabel)
-    plt.tight_layout()
-    
-    chart_image = get_chart_image()
-    plt.close()
-    
-    return chart_image
+    if total_land > 0:
+        utilization_rate = (cultivated_land / total_land) * 100
+    else:
+        utilization_rate = 0
+        
+    return {
+        'total_land': total_land,
+        'cultivated_land': cultivated_land,
+        'utilization_rate': utilization_rate,
+        'uncultivated_land': total_land - cultivated_land
+    }
 
 def calculate_land_utilization_efficiency():
     """Calculate land utilization efficiency metrics"""
     try:
-        total_land = LandParcel.objects.aggregate(Sum('total_area'))['total_area__sum'] or 0
-        cultivated_land = LandParcel.objects.aggregate(Sum('cultivated_area'))['cultivated_area__sum'] or 0
-        
-        if total_land > 0:
-            utilization_rate = (cultivated_land / total_land) * 100
-        else:
-            utilization_rate = 0
-            
-        return {
-            'total_land': total_land,
-            'cultivated_land': cultivated_land,
-            'utilization_rate': utilization_rate,
-            'uncultivated_land': total_land - cultivated_land
-        }
-    except Exception as e:
+        return cache.get_or_set(LAND_UTILIZATION_CACHE_KEY, _compute_land_utilization, LAND_UTILIZATION_TIMEOUT)
+    except DatabaseError:
         return {
             'total_land': 0,
             'cultivated_land': 0,
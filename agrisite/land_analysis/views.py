@@ -1,37 +1,39 @@
-import json
-import pandas as pd
-import matplotlib
-matplotlib.use('Agg')  # Set the backend before importing pyplot
-import matplotlib.pyplot as plt
-import seaborn as sns
-from io import BytesIO, StringIO
-import base64
+import csv
+import logging
+from django.conf import settings
 from django.shortcuts import render, get_object_or_404, redirect
-from django.http import JsonResponse, HttpResponse
-from django.db.models import Sum, Avg, Count, F, Q
+from django.urls import reverse
+from django.http import HttpResponse, Http404, FileResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, set_response_etag
+from django.core.cache import cache
+from django.db import DatabaseError, connection
+from django.db.models import Sum, Avg, Count, Q, FloatField, Prefetch
+from django.db.models.functions import Cast, NullIf
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import login, authenticate, logout
 from django.contrib import messages
-from django.contrib.auth.models import User
 from django.contrib.auth.views import LoginView
 import io
 import datetime
+import tempfile
+from operator import itemgetter
 from .models import *
-from .utils import generate_land_analysis_charts
+from .utils import (
+    get_chart_data, get_crop_names,
+    PAGE_STATS_TIMEOUT, SUMMARY_STATS_CACHE_KEY, RECENT_YEARS_CACHE_KEY,
+    DASHBOARD_REGION_CACHE_KEY, DASHBOARD_IRRIGATION_CACHE_KEY, DASHBOARD_CROP_CACHE_KEY,
+    ANALYSIS_REPORTS_CACHE_KEY, DASHBOARD_JSON_CACHE_KEY,
+    API_STATS_TIMEOUT, api_stats_cache_key, raw_decimal, OrjsonResponse, dumps_json,
+)
+from .exports import (
+    EXPORT_CHUNK_SIZE, export_queryset, stream_csv, stream_json, excel_bytes,
+    get_comprehensive_report_data, start_export_job, get_export_job,
+)
 from .forms import CustomUserCreationForm, UserProfileForm, ContactForm
 
-# Try to import reportlab, but provide fallbacks if not available
-try:
-    from reportlab.pdfgen import canvas
-    from reportlab.lib.pagesizes import letter, A4
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib.units import inch
-    from reportlab.lib import colors
-    REPORTLAB_AVAILABLE = True
-except ImportError:
-    REPORTLAB_AVAILABLE = False
-    print("ReportLab not available - PDF generation disabled")
+PDF_SPOOL_MAX_SIZE = 5 * 1024 * 1024  # bytes kept in memory before a report spills to disk
+
+logger = logging.getLogger(__name__)
 
 class CustomLoginView(LoginView):
     template_name = 'registration/login.html'
@@ -48,12 +50,63 @@ def custom_logout(request):
     logout(request)
     return redirect('home')
 
+def _fast_count(model):
+    """Row count for headline figures, from the planner estimate when USE_APPROX_COUNTS is on"""
+    if settings.USE_APPROX_COUNTS and connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [model._meta.db_table]
+            )
+            row = cursor.fetchone()
+        # reltuples is -1 until the table has been analyzed
+        if row and row[0] >= 0:
+            return row[0]
+    return model.objects.count()
+
+def _summary_stats():
+    """Headline totals shared by the home page and the dashboard"""
+    summary = DashboardSummary.get()
+    return {
+        'total_land_holders': _fast_count(LandHolder),
+        'total_parcels': _fast_count(LandParcel),
+        'total_cultivated_area': summary.total_cultivated_area,
+        'avg_productivity': summary.avg_productivity,
+    }
+
+def _recent_years():
+    """The five most recent years with cropping data"""
+    # year is a plain integer column, so there is no date truncation to do here;
+    # DISTINCT ... ORDER BY year DESC can walk cp_year_season_idx backwards
+    return list(CroppingPattern.objects.order_by('-year').values_list('year', flat=True).distinct()[:5])
+
+def _empty_summary_stats():
+    """Zeroed headline totals for when the database can't be read"""
+    return {
+        'total_land_holders': 0,
+        'total_parcels': 0,
+        'total_cultivated_area': 0,
+        'avg_productivity': 0,
+    }
+
+def _empty_home_context():
+    """Context for the home page when its statistics can't be loaded"""
+    stats = _empty_summary_stats()
+    return {
+        'total_land_holders': stats['total_land_holders'],
+        'total_parcels': stats['total_parcels'],
+        'total_cultivated_area': stats['total_cultivated_area'],
+        'recent_parcels': [],
+        'regions': [],
+        'soil_types': [],
+        'crops': [],
+        'years': [],
+    }
+
 def home(request):
     """Home page with overview"""
     try:
-        total_land_holders = LandHolder.objects.count()
-        total_parcels = LandParcel.objects.count()
-        total_cultivated_area = LandParcel.objects.aggregate(Sum('cultivated_area'))['cultivated_area__sum'] or 0
+        stats = cache.get_or_set(SUMMARY_STATS_CACHE_KEY, _summary_stats, PAGE_STATS_TIMEOUT)
         
         # Recent activities
         recent_parcels = LandParcel.objects.select_related('land_holder', 'land_holder__region').order_by('-created_at')[:5]
@@ -62,30 +115,21 @@ def home(request):
         regions = Region.objects.all()
         soil_types = LandParcel.SOIL_TYPES
         crops = Crop.objects.all()[:10]
-        years = CroppingPattern.objects.dates('year', 'year').distinct().order_by('-year')[:5]
+        years = cache.get_or_set(RECENT_YEARS_CACHE_KEY, _recent_years, PAGE_STATS_TIMEOUT)
         
         context = {
-            'total_land_holders': total_land_holders,
-            'total_parcels': total_parcels,
-            'total_cultivated_area': total_cultivated_area,
+            'total_land_holders': stats['total_land_holders'],
+            'total_parcels': stats['total_parcels'],
+            'total_cultivated_area': stats['total_cultivated_area'],
             'recent_parcels': recent_parcels,
             'regions': regions,
             'soil_types': soil_types,
             'crops': crops,
-            'years': [year.year for year in years],
-        }
-    except Exception as e:
-        # Handle case when database is empty
-        context = {
-            'total_land_holders': 0,
-            'total_parcels': 0,
-            'total_cultivated_area': 0,
-            'recent_parcels': [],
-            'regions': [],
-            'soil_types': [],
-            'crops': [],
-            'years': [],
+            'years': years,
         }
+    except DatabaseError:
+        logger.exception("Failed to load home page statistics")
+        context = _empty_home_context()
     
     return render(request, 'land_analysis/home.html', context)
 
@@ -152,85 +196,124 @@ def contact(request):
     }
     return render(request, 'land_analysis/contact.html', context)
 
+def _dashboard_region_data():
+    """Land distribution by region"""
+    return list(LandParcel.objects.values(
+        'land_holder__region__name', 'land_holder__region__id'
+    ).annotate(
+        total_area=Sum('total_area'),
+        parcel_count=Count('id')
+    ).order_by('-total_area'))
+
+def _dashboard_irrigation_data():
+    """Irrigation system distribution"""
+    return list(IrrigationSystem.objects.values(
+        'system_type'
+    ).annotate(
+        count=Count('id')
+    ))
+
+def _dashboard_crop_data():
+    """Top crops by allocated area"""
+    crop_data = list(CroppingPattern.objects.values(
+        'crop_id'
+    ).annotate(
+        total_area=Sum('area_allocated'),
+        avg_yield=Avg('yield_amount')
+    ).order_by('-total_area')[:10])
+    crop_names = get_crop_names()
+    for row in crop_data:
+        row['crop_name'] = crop_names.get(row['crop_id'])
+    return crop_data
+
+def _empty_dashboard_context():
+    """Context for the dashboard when its statistics can't be loaded"""
+    return {
+        'stats': _empty_summary_stats(),
+        'region_data': [],
+        'irrigation_data': [],
+        'crop_data': [],
+        'regions': [],
+        'soil_types': [],
+        'crops': [],
+        'years': [],
+    }
+
 @login_required
 def dashboard(request):
     """Main dashboard with analytics"""
     try:
-        # Basic statistics
-        stats = {
-            'total_land_holders': LandHolder.objects.count(),
-            'total_parcels': LandParcel.objects.count(),
-            'total_cultivated_area': LandParcel.objects.aggregate(Sum('cultivated_area'))['cultivated_area__sum'] or 0,
-            'avg_productivity': LandAnalysis.objects.aggregate(Avg('productivity_score'))['productivity_score__avg'] or 0,
-        }
-        
-        # Land distribution by region
-        region_data = LandParcel.objects.values(
-            'land_holder__region__name', 'land_holder__region__id'
-        ).annotate(
-            total_area=Sum('total_area'),
-            parcel_count=Count('id')
-        ).order_by('-total_area')
-        
-        # Irrigation system distribution
-        irrigation_data = IrrigationSystem.objects.values(
-            'system_type'
-        ).annotate(
-            count=Count('id')
-        )
-        
-        # Crop pattern analysis
-        crop_data = CroppingPattern.objects.values(
-            'crop__name', 'crop__id'
-        ).annotate(
-            total_area=Sum('area_allocated'),
-            avg_yield=Avg('yield_amount')
-        ).order_by('-total_area')[:10]
-        
-        # Generate charts
-        charts = generate_land_analysis_charts()
+        # Aggregates are cached and invalidated by signals when the data changes
+        stats = cache.get_or_set(SUMMARY_STATS_CACHE_KEY, _summary_stats, PAGE_STATS_TIMEOUT)
+        region_data = cache.get_or_set(DASHBOARD_REGION_CACHE_KEY, _dashboard_region_data, PAGE_STATS_TIMEOUT)
+        irrigation_data = cache.get_or_set(DASHBOARD_IRRIGATION_CACHE_KEY, _dashboard_irrigation_data, PAGE_STATS_TIMEOUT)
+        crop_data = cache.get_or_set(DASHBOARD_CROP_CACHE_KEY, _dashboard_crop_data, PAGE_STATS_TIMEOUT)
         
         # Additional data for enhanced dashboard
         regions = Region.objects.all()
         soil_types = LandParcel.SOIL_TYPES
         crops = Crop.objects.all()
-        years = CroppingPattern.objects.dates('year', 'year').distinct().order_by('-year')[:5]
+        years = cache.get_or_set(RECENT_YEARS_CACHE_KEY, _recent_years, PAGE_STATS_TIMEOUT)
         
-    except Exception as e:
-        # Handle empty database case
-        stats = {
-            'total_land_holders': 0,
-            'total_parcels': 0,
-            'total_cultivated_area': 0,
-            'avg_productivity': 0,
+        context = {
+            'stats': stats,
+            'region_data': list(region_data),
+            'irrigation_data': list(irrigation_data),
+            'crop_data': list(crop_data),
+            'regions': regions,
+            'soil_types': soil_types,
+            'crops': crops,
+            'years': years,
         }
-        region_data = []
-        irrigation_data = []
-        crop_data = []
-        charts = {}
-        regions = []
-        soil_types = []
-        crops = []
-        years = []
+    except DatabaseError:
+        logger.exception("Failed to load dashboard statistics")
+        context = _empty_dashboard_context()
     
-    context = {
-        'stats': stats,
-        'region_data': list(region_data),
-        'irrigation_data': list(irrigation_data),
-        'crop_data': list(crop_data),
-        'charts': charts,
-        'regions': regions,
-        'soil_types': soil_types,
-        'crops': crops,
-        'years': [year.year for year in years],
-    }
     return render(request, 'land_analysis/dashboard.html', context)
 
+def _dashboard_json():
+    """Serialize the dashboard chart and table data once so cache hits skip encoding"""
+    return dumps_json({
+        **get_chart_data(),
+        'stats': cache.get_or_set(SUMMARY_STATS_CACHE_KEY, _summary_stats, PAGE_STATS_TIMEOUT),
+        'region_data': cache.get_or_set(DASHBOARD_REGION_CACHE_KEY, _dashboard_region_data, PAGE_STATS_TIMEOUT),
+        'irrigation_data': cache.get_or_set(DASHBOARD_IRRIGATION_CACHE_KEY, _dashboard_irrigation_data, PAGE_STATS_TIMEOUT),
+        'crop_data': cache.get_or_set(DASHBOARD_CROP_CACHE_KEY, _dashboard_crop_data, PAGE_STATS_TIMEOUT),
+        'status': 'success',
+    })
+
+@login_required
+def dashboard_data_json(request):
+    """AJAX endpoint with the pre-serialized dashboard data"""
+    try:
+        payload = cache.get_or_set(DASHBOARD_JSON_CACHE_KEY, _dashboard_json, PAGE_STATS_TIMEOUT)
+    except DatabaseError:
+        logger.exception("Failed to load dashboard data")
+        return OrjsonResponse({
+            'status': 'error',
+            'message': 'Statistics are temporarily unavailable'
+        }, status=503)
+    
+    response = HttpResponse(payload, content_type='application/json')
+    # The payload sits behind login, so only the browser may cache it
+    patch_cache_control(response, private=True, max_age=PAGE_STATS_TIMEOUT)
+    return response
+
 @login_required
 def land_parcel_list(request):
     """List all land parcels"""
     try:
-        parcels = LandParcel.objects.select_related('land_holder', 'land_holder__region').prefetch_related('irrigation')
+        # Only load the columns the parcel cards render
+        parcels = LandParcel.objects.select_related(
+            'land_holder', 'land_holder__region'
+        ).prefetch_related(
+            Prefetch('irrigation', queryset=IrrigationSystem.objects.only(
+                'land_parcel_id', 'system_type', 'efficiency_rating'
+            ))
+        ).only(
+            'parcel_id', 'total_area', 'cultivated_area', 'soil_type',
+            'land_holder__name', 'land_holder__region__name'
+        )
         
         # Filtering
         region_filter = request.GET.get('region')
@@ -244,11 +327,25 @@ def land_parcel_list(request):
         regions = Region.objects.all()
         
         # Calculate additional statistics for enhanced view
-        total_area = parcels.aggregate(Sum('total_area'))['total_area__sum'] or 0
-        cultivated_area = parcels.aggregate(Sum('cultivated_area'))['cultivated_area__sum'] or 0
-        unique_crops = CroppingPattern.objects.filter(land_parcel__in=parcels).values('crop').distinct().count()
+        area_totals = parcels.aggregate(
+            total_area=Sum('total_area'),
+            cultivated_area=Sum('cultivated_area')
+        )
+        total_area = area_totals['total_area'] or 0
+        cultivated_area = area_totals['cultivated_area'] or 0
+        # Count straight from CroppingPattern, applying the parcel filters through its FK;
+        # the unfiltered list then needs no join at all
+        crop_filter = Q()
+        if region_filter:
+            crop_filter &= Q(land_parcel__land_holder__region_id=region_filter)
+        if soil_filter:
+            crop_filter &= Q(land_parcel__soil_type=soil_filter)
+        unique_crops = CroppingPattern.objects.filter(crop_filter).aggregate(
+            n=Count('crop', distinct=True)
+        )['n']
         
-    except Exception as e:
+    except DatabaseError:
+        logger.exception("Failed to load land parcel statistics")
         parcels = LandParcel.objects.none()
         regions = Region.objects.none()
         total_area = 0
@@ -302,53 +399,117 @@ def land_parcel_detail(request, pk):
     }
     return render(request, 'land_analysis/land_parcel_detail.html', context)
 
+ANALYSIS_REPORTS_SQL = """
+    WITH lh AS (
+        SELECT h.ownership_type AS name, COUNT(h.id) AS total, SUM(p.total_area) AS area, AVG(DISTINCT p.id) AS avg_id
+        FROM {holder} h LEFT OUTER JOIN {parcel} p ON p.land_holder_id = h.id
+        GROUP BY h.ownership_type
+    ), ie AS (
+        SELECT system_type AS name, AVG(efficiency_rating) AS efficiency, AVG(annual_water_usage) AS water_usage
+        FROM {irrigation}
+        GROUP BY system_type
+    ), cp AS (
+        SELECT c.name, c.crop_type, c.id, SUM(pat.area_allocated) AS area, AVG(pat.yield_amount) AS yield_avg,
+               SUM(pat.revenue) AS revenue
+        FROM {pattern} pat INNER JOIN {crop} c ON pat.crop_id = c.id
+        GROUP BY c.name, c.crop_type, c.id
+    ), pt AS (
+        SELECT year, SUM(yield_amount) AS yield_total, SUM(revenue) AS revenue
+        FROM {pattern}
+        GROUP BY year
+    )
+    SELECT 'lh' AS k, name, NULL AS kind, NULL AS ref, total AS v1, area AS v2, avg_id AS v3 FROM lh
+    UNION ALL SELECT 'ie', name, NULL, NULL, efficiency, water_usage, NULL FROM ie
+    UNION ALL SELECT 'cp', name, crop_type, id, area, yield_avg, revenue FROM cp
+    UNION ALL SELECT 'pt', NULL, NULL, year, yield_total, revenue, NULL FROM pt
+"""
+
+def _float(value):
+    return None if value is None else float(value)
+
+def _analysis_reports_data():
+    """Aggregates behind the analysis and reports page, fetched in a single round-trip"""
+    qn = connection.ops.quote_name
+    sql = ANALYSIS_REPORTS_SQL.format(
+        holder=qn(LandHolder._meta.db_table),
+        parcel=qn(LandParcel._meta.db_table),
+        irrigation=qn(IrrigationSystem._meta.db_table),
+        pattern=qn(CroppingPattern._meta.db_table),
+        crop=qn(Crop._meta.db_table),
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql)
+        rows = cursor.fetchall()
+    
+    # Demultiplex the UNION ALL result by its discriminator column
+    land_holding_analysis = []
+    irrigation_efficiency = []
+    crop_productivity = []
+    production_trend = []
+    for k, name, kind, ref, v1, v2, v3 in rows:
+        if k == 'lh':
+            land_holding_analysis.append({
+                'ownership_type': name,
+                # The UNION promotes the count to numeric on PostgreSQL
+                'count': int(v1),
+                'total_land': raw_decimal(v2),
+                'avg_parcels': _float(v3),
+            })
+        elif k == 'ie':
+            irrigation_efficiency.append({
+                'system_type': name,
+                'avg_efficiency': _float(v1),
+                'avg_water_usage': raw_decimal(v2),
+            })
+        elif k == 'cp':
+            crop_productivity.append({
+                'crop__name': name,
+                'crop__crop_type': kind,
+                'crop__id': ref,
+                'total_area': raw_decimal(v1),
+                'avg_yield': raw_decimal(v2),
+                'total_revenue': raw_decimal(v3),
+            })
+        else:
+            production_trend.append({
+                'year': ref,
+                'total_yield': raw_decimal(v1),
+                'total_revenue': raw_decimal(v2),
+            })
+    
+    crop_productivity.sort(key=lambda row: row['total_revenue'] or 0, reverse=True)
+    production_trend.sort(key=lambda row: row['year'])
+    
+    # Calculate additional metrics
+    summary = DashboardSummary.get()
+    
+    return {
+        'land_holding_analysis': land_holding_analysis,
+        'irrigation_efficiency': irrigation_efficiency,
+        'crop_productivity': crop_productivity,
+        'production_trend': production_trend,
+        'total_land_area': summary.total_area,
+        'total_cultivated_area': summary.total_cultivated_area,
+    }
+
 @login_required
 def analysis_reports(request):
     """Advanced analysis and reports"""
     try:
-        # Land holding analysis
-        land_holding_analysis = LandHolder.objects.values(
-            'ownership_type'
-        ).annotate(
-            count=Count('id'),
-            total_land=Sum('parcels__total_area'),
-            avg_parcels=Avg('parcels__id', distinct=True)
-        )
-        
-        # Irrigation efficiency analysis
-        irrigation_efficiency = IrrigationSystem.objects.values(
-            'system_type'
-        ).annotate(
-            avg_efficiency=Avg('efficiency_rating'),
-            avg_water_usage=Avg('annual_water_usage')
-        )
-        
-        # Crop productivity analysis
-        crop_productivity = CroppingPattern.objects.values(
-            'crop__name', 'crop__crop_type', 'crop__id'
-        ).annotate(
-            total_area=Sum('area_allocated'),
-            avg_yield=Avg('yield_amount'),
-            total_revenue=Sum('revenue')
-        ).order_by('-total_revenue')
-        
-        # Year-wise production trend
-        production_trend = CroppingPattern.objects.values(
-            'year'
-        ).annotate(
-            total_yield=Sum('yield_amount'),
-            total_revenue=Sum('revenue')
-        ).order_by('year')
+        data = cache.get_or_set(ANALYSIS_REPORTS_CACHE_KEY, _analysis_reports_data, PAGE_STATS_TIMEOUT)
+        land_holding_analysis = data['land_holding_analysis']
+        irrigation_efficiency = data['irrigation_efficiency']
+        crop_productivity = data['crop_productivity']
+        production_trend = data['production_trend']
+        total_land_area = data['total_land_area']
+        total_cultivated_area = data['total_cultivated_area']
         
         # Additional data for enhanced analysis reports
         regions = Region.objects.all()
         soil_types = LandParcel.SOIL_TYPES
         
-        # Calculate additional metrics
-        total_land_area = LandParcel.objects.aggregate(Sum('total_area'))['total_area__sum'] or 0
-        total_cultivated_area = LandParcel.objects.aggregate(Sum('cultivated_area'))['cultivated_area__sum'] or 0
-        
-    except Exception as e:
+    except DatabaseError:
+        logger.exception("Failed to load analysis report statistics")
         land_holding_analysis = []
         irrigation_efficiency = []
         crop_productivity = []
@@ -375,359 +536,88 @@ def download_analysis_report(request, report_type):
     """
     Generate and download analysis reports in PDF format
     """
+    # Imported here so ReportLab only loads for workers that build PDFs
+    from .reports import REPORTLAB_AVAILABLE, build_analysis_report
+    
     if not REPORTLAB_AVAILABLE:
         messages.error(request, 'PDF generation is not available. Please install ReportLab.')
         return redirect('analysis_reports')
     
     try:
-        # Create a file-like buffer to receive PDF data
-        buffer = io.BytesIO()
-        
-        # Create the PDF object
-        doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=50, bottomMargin=50)
-        
-        # Container for the 'Flowable' objects
-        story = []
-        
-        # Get sample styles
-        styles = getSampleStyleSheet()
-        
-        # Create custom styles
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=18,
-            spaceAfter=30,
-            textColor='#2E7D32',
-            alignment=1
-        )
-        
-        heading_style = ParagraphStyle(
-            'CustomHeading',
-            parent=styles['Heading2'],
-            fontSize=14,
-            spaceAfter=12,
-            textColor='#1B5E20',
-            spaceBefore=20
-        )
-        
-        normal_style = ParagraphStyle(
-            'CustomNormal',
-            parent=styles['Normal'],
-            fontSize=10,
-            spaceAfter=12
-        )
-        
-        # Add title
-        title_text = f"Agricultural Analysis Report - {report_type.title()}"
-        story.append(Paragraph(title_text, title_style))
-        story.append(Spacer(1, 20))
-        
-        # Add report date
-        current_date = datetime.datetime.now().strftime("%B %d, %Y")
-        story.append(Paragraph(f"Generated on: {current_date}", normal_style))
-        story.append(Spacer(1, 30))
-        
-        # Generate content based on report type
-        if report_type == 'summary':
-            story = _generate_summary_report(story, styles, heading_style, normal_style)
-        elif report_type == 'land_analysis':
-            story = _generate_land_analysis_report(story, styles, heading_style, normal_style)
-        elif report_type == 'crop_analysis':
-            story = _generate_crop_analysis_report(story, styles, heading_style, normal_style)
-        elif report_type == 'irrigation_analysis':
-            story = _generate_irrigation_analysis_report(story, styles, heading_style, normal_style)
-        elif report_type == 'comprehensive':
-            story = _generate_comprehensive_report(story, styles, heading_style, normal_style)
-        else:
-            story.append(Paragraph("Invalid report type selected.", normal_style))
-        
-        # Build PDF
-        doc.build(story)
-        
-        # File response
+        # Large reports spill to a temporary file instead of growing worker memory
+        buffer = tempfile.SpooledTemporaryFile(max_size=PDF_SPOOL_MAX_SIZE)
+        try:
+            build_analysis_report(buffer, report_type)
+        except Exception:
+            buffer.close()
+            raise
+        
+        # FileResponse streams the file in chunks and closes it when done
         buffer.seek(0)
-        response = HttpResponse(buffer, content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="agriculture_report_{report_type}_{datetime.datetime.now().strftime("%Y%m%d")}.pdf"'
-        
-        return response
-        
-    except Exception as e:
-        messages.error(request, f'Error generating report: {str(e)}')
-        return redirect('analysis_reports')
-
-def _generate_summary_report(story, styles, heading_style, normal_style):
-    """Generate summary report content"""
-    try:
-        # Basic statistics
-        total_land_holders = LandHolder.objects.count()
-        total_parcels = LandParcel.objects.count()
-        total_cultivated_area = LandParcel.objects.aggregate(Sum('cultivated_area'))['cultivated_area__sum'] or 0
-        total_revenue = CroppingPattern.objects.aggregate(Sum('revenue'))['revenue__sum'] or 0
-        
-        story.append(Paragraph("Executive Summary", heading_style))
-        
-        summary_data = [
-            ["Metric", "Value"],
-            ["Total Land Holders", f"{total_land_holders:,}"],
-            ["Total Land Parcels", f"{total_parcels:,}"],
-            ["Total Cultivated Area", f"{total_cultivated_area:,.2f} hectares"],
-            ["Total Revenue Generated", f"₹{total_revenue:,.2f}"],
-        ]
-        
-        table = Table(summary_data, colWidths=[3*inch, 3*inch])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4CAF50')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#F1F8E9')),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        
-        story.append(table)
-        story.append(Spacer(1, 20))
-        
-    except Exception as e:
-        story.append(Paragraph(f"Error generating summary: {str(e)}", normal_style))
-    
-    return story
-
-def _generate_land_analysis_report(story, styles, heading_style, normal_style):
-    """Generate land analysis report content"""
-    try:
-        story.append(Paragraph("Land Holding Analysis", heading_style))
-        
-        # Land holding by type
-        land_analysis = LandHolder.objects.values('ownership_type').annotate(
-            count=Count('id'),
-            total_land=Sum('parcels__total_area')
-        )
-        
-        if land_analysis:
-            land_data = [["Ownership Type", "Count", "Total Land Area (hectares)"]]
-            for item in land_analysis:
-                land_data.append([
-                    item['ownership_type'],
-                    str(item['count']),
-                    f"{item['total_land'] or 0:,.2f}"
-                ])
-            
-            table = Table(land_data, colWidths=[2*inch, 1.5*inch, 2.5*inch])
-            table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4CAF50')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#F1F8E9')),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            
-            story.append(table)
-        else:
-            story.append(Paragraph("No land holding data available.", normal_style))
-            
-        story.append(Spacer(1, 20))
-        
-    except Exception as e:
-        story.append(Paragraph(f"Error generating land analysis: {str(e)}", normal_style))
-    
-    return story
-
-def _generate_crop_analysis_report(story, styles, heading_style, normal_style):
-    """Generate crop analysis report content"""
-    try:
-        story.append(Paragraph("Crop Productivity Analysis", heading_style))
-        
-        # Top crops by revenue
-        crop_analysis = CroppingPattern.objects.values('crop__name').annotate(
-            total_area=Sum('area_allocated'),
-            total_yield=Sum('yield_amount'),
-            total_revenue=Sum('revenue')
-        ).order_by('-total_revenue')[:10]
-        
-        if crop_analysis:
-            crop_data = [["Crop Name", "Area (hectares)", "Total Yield", "Revenue (₹)"]]
-            for item in crop_analysis:
-                crop_data.append([
-                    item['crop__name'] or 'Unknown',
-                    f"{item['total_area'] or 0:,.2f}",
-                    f"{item['total_yield'] or 0:,.2f}",
-                    f"₹{item['total_revenue'] or 0:,.2f}"
-                ])
-            
-            table = Table(crop_data, colWidths=[1.5*inch, 1.5*inch, 1.5*inch, 1.5*inch])
-            table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4CAF50')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 9),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#F1F8E9')),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            
-            story.append(table)
-        else:
-            story.append(Paragraph("No crop data available.", normal_style))
-            
-        story.append(Spacer(1, 20))
-        
-    except Exception as e:
-        story.append(Paragraph(f"Error generating crop analysis: {str(e)}", normal_style))
-    
-    return story
-
-def _generate_irrigation_analysis_report(story, styles, heading_style, normal_style):
-    """Generate irrigation analysis report content"""
-    try:
-        story.append(Paragraph("Irrigation System Analysis", heading_style))
-        
-        # Irrigation system efficiency
-        irrigation_analysis = IrrigationSystem.objects.values('system_type').annotate(
-            count=Count('id'),
-            avg_efficiency=Avg('efficiency_rating'),
-            avg_water_usage=Avg('annual_water_usage')
+        return FileResponse(
+            buffer,
+            as_attachment=True,
+            filename=f'agriculture_report_{report_type}_{datetime.datetime.now().strftime("%Y%m%d")}.pdf',
+            content_type='application/pdf'
         )
         
-        if irrigation_analysis:
-            irrigation_data = [["System Type", "Count", "Avg Efficiency", "Avg Water Usage"]]
-            for item in irrigation_analysis:
-                irrigation_data.append([
-                    item['system_type'],
-                    str(item['count']),
-                    f"{item['avg_efficiency'] or 0:.1f}%",
-                    f"{item['avg_water_usage'] or 0:,.0f} liters"
-                ])
-            
-            table = Table(irrigation_data, colWidths=[1.5*inch, 1*inch, 1.5*inch, 1.5*inch])
-            table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4CAF50')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 9),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#F1F8E9')),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            
-            story.append(table)
-        else:
-            story.append(Paragraph("No irrigation data available.", normal_style))
-            
-        story.append(Spacer(1, 20))
-        
-    except Exception as e:
-        story.append(Paragraph(f"Error generating irrigation analysis: {str(e)}", normal_style))
-    
-    return story
-
-def _generate_comprehensive_report(story, styles, heading_style, normal_style):
-    """Generate comprehensive report content"""
-    try:
-        # Include all report types
-        story = _generate_summary_report(story, styles, heading_style, normal_style)
-        story = _generate_land_analysis_report(story, styles, heading_style, normal_style)
-        story = _generate_crop_analysis_report(story, styles, heading_style, normal_style)
-        story = _generate_irrigation_analysis_report(story, styles, heading_style, normal_style)
-        
-        # Add recommendations
-        story.append(Paragraph("Recommendations", heading_style))
-        recommendations = [
-            "• Consider expanding high-revenue crop cultivation",
-            "• Optimize irrigation systems for better water efficiency",
-            "• Implement soil health improvement programs",
-            "• Explore diversification of crop patterns",
-            "• Invest in modern agricultural technologies"
-        ]
-        
-        for rec in recommendations:
-            story.append(Paragraph(rec, normal_style))
-            
-    except Exception as e:
-        story.append(Paragraph(f"Error generating comprehensive report: {str(e)}", normal_style))
-    
-    return story
+    except DatabaseError:
+        logger.exception("Failed to generate %s report", report_type)
+        messages.error(request, 'Error generating report, please try again later.')
+        return redirect('analysis_reports')
 
 @login_required
 def download_parcel_report(request, pk):
     """Download individual parcel report"""
+    from .reports import REPORTLAB_AVAILABLE, build_parcel_report
+    
     try:
-        parcel = get_object_or_404(LandParcel, pk=pk)
+        # One JOINed query for just the columns the report prints
+        parcel = get_object_or_404(
+            LandParcel.objects.select_related(
+                'land_holder',
+                'land_holder__region'
+            ).only(
+                'parcel_id', 'total_area', 'cultivated_area', 'soil_type',
+                'land_holder__name', 'land_holder__region__name'
+            ),
+            pk=pk
+        )
         
         if not REPORTLAB_AVAILABLE:
             # Fallback to CSV if ReportLab not available
-            import pandas as pd
-            data = {
-                'Field': ['Parcel ID', 'Total Area', 'Cultivated Area', 'Soil Type', 'Land Holder', 'Region'],
-                'Value': [
-                    parcel.parcel_id,
-                    f"{parcel.total_area} hectares",
-                    f"{parcel.cultivated_area} hectares",
-                    parcel.get_soil_type_display(),
-                    parcel.land_holder.name,
-                    parcel.land_holder.region.name if parcel.land_holder.region else 'N/A'
-                ]
-            }
-            df = pd.DataFrame(data)
+            fields = ['Parcel ID', 'Total Area', 'Cultivated Area', 'Soil Type', 'Land Holder', 'Region']
+            values = [
+                parcel.parcel_id,
+                f"{parcel.total_area} hectares",
+                f"{parcel.cultivated_area} hectares",
+                parcel.get_soil_type_display(),
+                parcel.land_holder.name,
+                parcel.land_holder.region.name if parcel.land_holder.region else 'N/A'
+            ]
             
             response = HttpResponse(content_type='text/csv')
             response['Content-Disposition'] = f'attachment; filename="parcel_{parcel.parcel_id}_report.csv"'
-            df.to_csv(response, index=False)
+            writer = csv.writer(response, lineterminator='\n')
+            writer.writerow(['Field', 'Value'])
+            writer.writerows(zip(fields, values))
             return response
         
         # PDF generation with ReportLab
         buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=A4)
-        story = []
-        
-        styles = getSampleStyleSheet()
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=16,
-            spaceAfter=30,
-            textColor='#2E7D32',
-            alignment=1
-        )
-        
-        story.append(Paragraph(f"Land Parcel Report - {parcel.parcel_id}", title_style))
-        story.append(Spacer(1, 20))
-        
-        # Add parcel details
-        parcel_data = [
-            ["Parcel ID", parcel.parcel_id],
-            ["Total Area", f"{parcel.total_area} hectares"],
-            ["Cultivated Area", f"{parcel.cultivated_area} hectares"],
-            ["Soil Type", parcel.get_soil_type_display()],
-            ["Land Holder", parcel.land_holder.name],
-            ["Region", parcel.land_holder.region.name if parcel.land_holder.region else 'N/A'],
-        ]
-        
-        table = Table(parcel_data, colWidths=[2*inch, 4*inch])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4CAF50')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#F1F8E9')),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        
-        story.append(table)
-        doc.build(story)
+        build_parcel_report(buffer, parcel)
         
         buffer.seek(0)
-        response = HttpResponse(buffer, content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="parcel_{parcel.parcel_id}_report.pdf"'
-        return response
+        return FileResponse(
+            buffer,
+            as_attachment=True,
+            filename=f'parcel_{parcel.parcel_id}_report.pdf',
+            content_type='application/pdf'
+        )
         
-    except Exception as e:
-        messages.error(request, f'Error generating parcel report: {str(e)}')
+    except DatabaseError:
+        logger.exception("Failed to generate report for parcel %s", pk)
+        messages.error(request, 'Error generating parcel report, please try again later.')
         return redirect('land_parcel_detail', pk=pk)
 
 @login_required
@@ -741,10 +631,15 @@ def region_analysis(request, region_id):
             land_holder__region=region
         ).aggregate(
             total_parcels=Count('id'),
-            total_area=Sum('total_area'),
+            # Aliased so later expressions still refer to the total_area column
+            land_area=Sum('total_area'),
             avg_parcel_size=Avg('total_area'),
-            cultivated_percentage=Avg('cultivated_area') / Avg('total_area') * 100
+            # Area-weighted share of the region's land that is cultivated
+            cultivated_percentage=Cast(Sum('cultivated_area'), FloatField()) * 100.0 / NullIf(
+                Cast(Sum('total_area'), FloatField()), 0.0
+            )
         )
+        region_stats['total_area'] = region_stats.pop('land_area')
         
         # Top crops in region
         top_crops = CroppingPattern.objects.filter(
@@ -773,7 +668,8 @@ def region_analysis(request, region_id):
             avg_efficiency=Avg('efficiency_rating')
         )
         
-    except Exception as e:
+    except DatabaseError:
+        logger.exception("Failed to load statistics for region %s", region_id)
         region_stats = {}
         top_crops = []
         soil_distribution = []
@@ -789,54 +685,97 @@ def region_analysis(request, region_id):
     
     return render(request, 'land_analysis/region_analysis.html', context)
 
+CROP_BREAKDOWN_SQL = """
+    WITH patterns AS (
+        SELECT land_parcel_id, season, year, area_allocated, yield_amount, revenue
+        FROM {pattern}
+        WHERE crop_id = %s
+    )
+    SELECT 'region' AS k, r.name AS name, r.id AS ref, SUM(pat.area_allocated) AS v1,
+           SUM(pat.yield_amount) AS v2, SUM(pat.revenue) AS v3
+    FROM patterns pat INNER JOIN {parcel} p ON pat.land_parcel_id = p.id
+    INNER JOIN {holder} h ON p.land_holder_id = h.id
+    INNER JOIN {region} r ON h.region_id = r.id
+    GROUP BY r.name, r.id
+    UNION ALL SELECT 'season', season, NULL, AVG(yield_amount), AVG(revenue), SUM(area_allocated)
+    FROM patterns
+    GROUP BY season
+    UNION ALL SELECT 'year', NULL, year, SUM(yield_amount), SUM(revenue), SUM(area_allocated)
+    FROM patterns
+    GROUP BY year
+"""
+
+def _crop_breakdown(crop_id):
+    """Regional, seasonal and yearly groupings of one crop's patterns, fetched in a single round-trip"""
+    qn = connection.ops.quote_name
+    sql = CROP_BREAKDOWN_SQL.format(
+        pattern=qn(CroppingPattern._meta.db_table),
+        parcel=qn(LandParcel._meta.db_table),
+        holder=qn(LandHolder._meta.db_table),
+        region=qn(Region._meta.db_table),
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [crop_id])
+        rows = cursor.fetchall()
+    
+    # Demultiplex the UNION ALL result by its discriminator column
+    regional_distribution = []
+    seasonal_performance = []
+    yearly_trend = []
+    for k, name, ref, v1, v2, v3 in rows:
+        if k == 'region':
+            regional_distribution.append({
+                'land_parcel__land_holder__region__name': name,
+                'land_parcel__land_holder__region__id': ref,
+                'area': raw_decimal(v1),
+                'yield_amount': raw_decimal(v2),
+                'revenue': raw_decimal(v3),
+            })
+        elif k == 'season':
+            seasonal_performance.append({
+                'season': name,
+                'avg_yield': raw_decimal(v1),
+                'avg_revenue': raw_decimal(v2),
+                'total_area': raw_decimal(v3),
+            })
+        else:
+            yearly_trend.append({
+                'year': ref,
+                'total_yield': raw_decimal(v1),
+                'total_revenue': raw_decimal(v2),
+                'total_area': raw_decimal(v3),
+            })
+    return regional_distribution, seasonal_performance, yearly_trend
+
 @login_required
 def crop_analysis(request, crop_id):
     """Detailed analysis for a specific crop"""
     crop = get_object_or_404(Crop, pk=crop_id)
     
     try:
-        # Crop statistics
-        crop_stats = CroppingPattern.objects.filter(
-            crop=crop
-        ).aggregate(
+        # Crop statistics, with per-hectare figures as Sum/Sum rather than a ratio of averages
+        crop_stats = CroppingPattern.objects.filter(crop=crop).aggregate(
             total_area=Sum('area_allocated'),
             total_yield=Sum('yield_amount'),
-            avg_yield_per_hectare=Avg('yield_amount') / Avg('area_allocated'),
+            avg_yield_per_hectare=Cast(Sum('yield_amount'), FloatField()) / NullIf(
+                Cast(Sum('area_allocated'), FloatField()), 0.0
+            ),
             total_revenue=Sum('revenue'),
-            avg_revenue_per_hectare=Avg('revenue') / Avg('area_allocated')
+            avg_revenue_per_hectare=Cast(Sum('revenue'), FloatField()) / NullIf(
+                Cast(Sum('area_allocated'), FloatField()), 0.0
+            )
         )
         
-        # Regional distribution of crop
-        regional_distribution = CroppingPattern.objects.filter(
-            crop=crop
-        ).values(
-            'land_parcel__land_holder__region__name',
-            'land_parcel__land_holder__region__id'
-        ).annotate(
-            area=Sum('area_allocated'),
-            yield_amount=Sum('yield_amount'),
-            revenue=Sum('revenue')
-        ).order_by('-area')
-        
-        # Seasonal performance
-        seasonal_performance = CroppingPattern.objects.filter(
-            crop=crop
-        ).values('season').annotate(
-            avg_yield=Avg('yield_amount'),
-            avg_revenue=Avg('revenue'),
-            total_area=Sum('area_allocated')
-        )
+        # Regional distribution, seasonal performance and yearly trend
+        regional_distribution, seasonal_performance, yearly_trend = _crop_breakdown(crop.pk)
         
-        # Yearly trend
-        yearly_trend = CroppingPattern.objects.filter(
-            crop=crop
-        ).values('year').annotate(
-            total_yield=Sum('yield_amount'),
-            total_revenue=Sum('revenue'),
-            total_area=Sum('area_allocated')
-        ).order_by('year')
+        # There are only a handful of groups, so they are sorted here rather than
+        # adding a sort step after the database's GROUP BY
+        regional_distribution.sort(key=itemgetter('area'), reverse=True)
+        yearly_trend.sort(key=itemgetter('year'))
         
-    except Exception as e:
+    except DatabaseError:
+        logger.exception("Failed to load statistics for crop %s", crop_id)
         crop_stats = {}
         regional_distribution = []
         seasonal_performance = []
@@ -852,6 +791,106 @@ def crop_analysis(request, crop_id):
     
     return render(request, 'land_analysis/crop_analysis.html', context)
 
+LAND_STATS_SQL = """
+    WITH parcels AS (
+        SELECT p.id, p.soil_type, p.total_area
+        FROM {parcel} p INNER JOIN {holder} h ON p.land_holder_id = h.id
+        WHERE {filters}
+    )
+    SELECT 'soil' AS k, soil_type AS name, COUNT(id) AS v1, SUM(total_area) AS v2, NULL AS v3
+    FROM parcels
+    GROUP BY soil_type
+    UNION ALL SELECT 'irrigation', i.system_type, COUNT(i.id), AVG(i.efficiency_rating), NULL
+    FROM {irrigation} i INNER JOIN parcels ON i.land_parcel_id = parcels.id
+    GROUP BY i.system_type
+    UNION ALL SELECT 'crop', c.crop_type, SUM(pat.area_allocated), AVG(pat.yield_amount), NULL
+    FROM {pattern} pat INNER JOIN parcels ON pat.land_parcel_id = parcels.id
+    INNER JOIN {crop} c ON pat.crop_id = c.id
+    GROUP BY c.crop_type
+    UNION ALL SELECT 'region', r.name, COUNT(p.id), SUM(p.total_area), SUM(p.cultivated_area)
+    FROM {parcel} p INNER JOIN {holder} h ON p.land_holder_id = h.id
+    INNER JOIN {region} r ON h.region_id = r.id
+    GROUP BY r.name
+"""
+
+def _land_stats_data(region_id, soil_type):
+    """Land statistics for the optional filters, fetched in a single round-trip"""
+    # The filters narrow the parcels, and through them the irrigation and cropping rows;
+    # region statistics always cover every parcel
+    filters = ['1 = 1']
+    params = []
+    if region_id is not None:
+        filters.append('h.region_id = %s')
+        params.append(region_id)
+    if soil_type:
+        filters.append('p.soil_type = %s')
+        params.append(soil_type)
+    
+    qn = connection.ops.quote_name
+    sql = LAND_STATS_SQL.format(
+        parcel=qn(LandParcel._meta.db_table),
+        holder=qn(LandHolder._meta.db_table),
+        irrigation=qn(IrrigationSystem._meta.db_table),
+        pattern=qn(CroppingPattern._meta.db_table),
+        crop=qn(Crop._meta.db_table),
+        region=qn(Region._meta.db_table),
+        filters=' AND '.join(filters),
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    
+    # Demultiplex the UNION ALL result by its discriminator column
+    soil_distribution = []
+    irrigation_distribution = []
+    crop_distribution = []
+    region_stats = []
+    for k, name, v1, v2, v3 in rows:
+        if k == 'soil':
+            soil_distribution.append({
+                'soil_type': name,
+                # The UNION promotes the counts to numeric on PostgreSQL
+                'count': int(v1),
+                'total_area': raw_decimal(v2),
+            })
+        elif k == 'irrigation':
+            irrigation_distribution.append({
+                'system_type': name,
+                'count': int(v1),
+                'avg_efficiency': _float(v2),
+            })
+        elif k == 'crop':
+            crop_distribution.append({
+                'crop__crop_type': name,
+                'total_area': raw_decimal(v1),
+                'avg_yield': raw_decimal(v2),
+            })
+        else:
+            region_stats.append({
+                'land_holder__region__name': name,
+                'parcel_count': int(v1),
+                'total_area': raw_decimal(v2),
+                'cultivated_area': raw_decimal(v3),
+            })
+    
+    return {
+        'soil_distribution': soil_distribution,
+        'irrigation_distribution': irrigation_distribution,
+        'crop_distribution': crop_distribution,
+        'region_stats': region_stats,
+    }
+
+def _land_stats_cache_key(request):
+    # time_period doesn't change the result, so it stays out of the cache key
+    return api_stats_cache_key('api:land_stats', request.GET.get('region'), request.GET.get('soil_type'))
+
+def _conditional_json(request, payload):
+    """JSON response whose ETag hashes its content, or a 304 when the client's copy still matches"""
+    # Hashing the payload itself keeps the ETag honest in every worker, whichever cache it has
+    response = OrjsonResponse(payload)
+    set_response_etag(response)
+    return get_conditional_response(request, etag=response['ETag'], response=response)
+
 @login_required
 def api_land_stats(request):
     """API endpoint for land statistics"""
@@ -861,112 +900,122 @@ def api_land_stats(request):
         soil_type = request.GET.get('soil_type')
         time_period = request.GET.get('time_period', '30d')
         
-        # Base querysets
-        land_parcels = LandParcel.objects.all()
-        irrigation_systems = IrrigationSystem.objects.all()
-        cropping_patterns = CroppingPattern.objects.all()
-        
-        # Apply filters
-        if region_id:
-            land_parcels = land_parcels.filter(land_holder__region_id=region_id)
-            irrigation_systems = irrigation_systems.filter(land_parcel__land_holder__region_id=region_id)
-            cropping_patterns = cropping_patterns.filter(land_parcel__land_holder__region_id=region_id)
-            
-        if soil_type:
-            land_parcels = land_parcels.filter(soil_type=soil_type)
-            irrigation_systems = irrigation_systems.filter(land_parcel__soil_type=soil_type)
-            cropping_patterns = cropping_patterns.filter(land_parcel__soil_type=soil_type)
-        
-        # Land distribution by soil type
-        soil_distribution = land_parcels.values('soil_type').annotate(
-            count=Count('id'),
-            total_area=Sum('total_area')
-        )
-        
-        # Irrigation system distribution
-        irrigation_distribution = irrigation_systems.values('system_type').annotate(
-            count=Count('id'),
-            avg_efficiency=Avg('efficiency_rating')
-        )
-        
-        # Crop type distribution
-        crop_distribution = cropping_patterns.values('crop__crop_type').annotate(
-            total_area=Sum('area_allocated'),
-            avg_yield=Avg('yield_amount')
-        )
-        
-        # Region statistics
-        region_stats = LandParcel.objects.values('land_holder__region__name').annotate(
-            parcel_count=Count('id'),
-            total_area=Sum('total_area'),
-            cultivated_area=Sum('cultivated_area')
-        )
-        
-        return JsonResponse({
-            'soil_distribution': list(soil_distribution),
-            'irrigation_distribution': list(irrigation_distribution),
-            'crop_distribution': list(crop_distribution),
-            'region_stats': list(region_stats),
+        cache_key = _land_stats_cache_key(request)
+        payload = cache.get(cache_key)
+        if payload is not None:
+            return _conditional_json(request, payload)
+        
+        payload = _land_stats_data(int(region_id) if region_id else None, soil_type)
+        payload['status'] = 'success'
+        cache.set(cache_key, payload, API_STATS_TIMEOUT)
+        return _conditional_json(request, payload)
+    except ValueError:
+        # A non-numeric region id
+        return OrjsonResponse({
+            'status': 'error',
+            'message': 'Invalid filter'
+        }, status=400)
+    except DatabaseError:
+        logger.exception("Failed to load land statistics")
+        return OrjsonResponse({
+            'status': 'error',
+            'message': 'Statistics are temporarily unavailable'
+        }, status=503)
+
+@login_required
+def api_chart_data(request):
+    """API endpoint with the aggregated data behind the dashboard charts"""
+    try:
+        return OrjsonResponse({
+            **get_chart_data(),
             'status': 'success'
         })
-    except Exception as e:
-        return JsonResponse({
+    except DatabaseError:
+        logger.exception("Failed to load chart data")
+        return OrjsonResponse({
             'status': 'error',
-            'message': str(e)
-        }, status=500)
+            'message': 'Statistics are temporarily unavailable'
+        }, status=503)
 
 @login_required
 def export_data(request, data_type):
     """Export data in various formats"""
     try:
-        if data_type == 'land_parcels':
-            data = LandParcel.objects.all().values(
-                'parcel_id', 'total_area', 'cultivated_area', 'soil_type',
-                'land_holder__name', 'land_holder__region__name'
-            )
-            filename = 'land_parcels'
-        elif data_type == 'cropping_patterns':
-            data = CroppingPattern.objects.all().values(
-                'crop__name', 'year', 'season', 'area_allocated', 
-                'yield_amount', 'revenue', 'land_parcel__parcel_id'
-            )
-            filename = 'cropping_patterns'
-        elif data_type == 'irrigation_systems':
-            data = IrrigationSystem.objects.all().values(
-                'system_type', 'efficiency_rating', 'annual_water_usage',
-                'land_parcel__parcel_id'
-            )
-            filename = 'irrigation_systems'
-        elif data_type == 'comprehensive_report':
+        format_type = request.GET.get('format', 'json')
+        export = export_queryset(data_type)
+        if export is None and data_type != 'comprehensive_report':
+            return OrjsonResponse({'error': 'Invalid data type'}, status=400)
+        
+        # Large exports can be built in the background and fetched once ready. Job state
+        # lives in the cache, so a poll can reach any worker only when the cache is shared;
+        # without one the export is served directly
+        if request.GET.get('async') and settings.REDIS_URL:
+            return _queue_export(request, data_type, format_type)
+        
+        if data_type == 'comprehensive_report':
             # Generate comprehensive report
             return generate_comprehensive_report(request)
-        else:
-            return JsonResponse({'error': 'Invalid data type'}, status=400)
         
-        # Convert to DataFrame for better formatting
-        df = pd.DataFrame(list(data))
-        
-        # Determine response format
-        format_type = request.GET.get('format', 'json')
+        data, fields = export
+        filename = data_type
         
         if format_type == 'csv':
-            response = HttpResponse(content_type='text/csv')
+            # Rows are written out as they are fetched instead of after the whole table
+            response = StreamingHttpResponse(stream_csv(data, fields), content_type='text/csv')
             response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
-            df.to_csv(response, index=False)
             return response
         elif format_type == 'excel':
-            response = HttpResponse(content_type='application/vnd.ms-excel')
+            response = HttpResponse(excel_bytes(data, fields), content_type='application/vnd.ms-excel')
             response['Content-Disposition'] = f'attachment; filename="{filename}.xlsx"'
-            df.to_excel(response, index=False)
             return response
         else:
-            # Default to JSON
-            response = JsonResponse(list(data), safe=False)
+            # Default to JSON, streamed like the CSV export; iterator() fetches in chunks
+            # (a server-side cursor on PostgreSQL) and skips the queryset result cache
+            rows = data.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+            response = StreamingHttpResponse(stream_json(rows), content_type='application/json')
             response['Content-Disposition'] = f'attachment; filename="{filename}.json"'
             return response
             
-    except Exception as e:
-        return JsonResponse({'error': str(e)}, status=500)
+    except DatabaseError:
+        logger.exception("Failed to export %s", data_type)
+        return OrjsonResponse({'error': 'Export is temporarily unavailable'}, status=503)
+
+def _queue_export(request, data_type, format_type):
+    """Start a background export and point the client at its status endpoint"""
+    task_id = start_export_job(request.user.id, data_type, format_type)
+    return OrjsonResponse({
+        'task_id': task_id,
+        'status': 'PENDING',
+        'status_url': reverse('export_status', args=[task_id]),
+    }, status=202)
+
+@login_required
+def export_status(request, task_id):
+    """Poll a background export; the download URL is included once it has finished"""
+    job = get_export_job(task_id)
+    if job is None or job['user_id'] != request.user.id:
+        raise Http404("Unknown export")
+    
+    data = {'task_id': task_id, 'status': job['status']}
+    if job['status'] == 'SUCCESS':
+        data['url'] = reverse('export_download', args=[task_id])
+    elif job['status'] == 'FAILURE':
+        data['error'] = job['error']
+    return OrjsonResponse(data)
+
+@login_required
+def export_download(request, task_id):
+    """Download the file written by a finished background export"""
+    job = get_export_job(task_id)
+    if job is None or job['user_id'] != request.user.id or job['status'] != 'SUCCESS':
+        raise Http404("Export not available")
+    
+    return FileResponse(
+        open(job['path'], 'rb'),
+        as_attachment=True,
+        filename=job['filename'],
+        content_type=job['content_type']
+    )
 
 def generate_comprehensive_report(request):
     """Generate a comprehensive PDF report"""
@@ -974,34 +1023,103 @@ def generate_comprehensive_report(request):
         # This would typically generate a PDF using a library like ReportLab
         # For now, return a JSON response with comprehensive data
         
-        comprehensive_data = {
-            'summary': {
-                'total_land_holders': LandHolder.objects.count(),
-                'total_parcels': LandParcel.objects.count(),
-                'total_cultivated_area': LandParcel.objects.aggregate(Sum('cultivated_area'))['cultivated_area__sum'] or 0,
-                'total_revenue': CroppingPattern.objects.aggregate(Sum('revenue'))['revenue__sum'] or 0,
-            },
-            'land_analysis': list(LandHolder.objects.values('ownership_type').annotate(
-                count=Count('id'),
-                total_land=Sum('parcels__total_area')
-            )),
-            'crop_analysis': list(CroppingPattern.objects.values('crop__name').annotate(
-                total_area=Sum('area_allocated'),
-                total_yield=Sum('yield_amount'),
-                total_revenue=Sum('revenue')
-            )),
-            'irrigation_analysis': list(IrrigationSystem.objects.values('system_type').annotate(
-                count=Count('id'),
-                avg_efficiency=Avg('efficiency_rating')
-            )),
-        }
+        # Precomputed until the underlying data changes, like the page aggregates
+        comprehensive_data = get_comprehensive_report_data()
         
-        response = JsonResponse(comprehensive_data)
+        response = OrjsonResponse(comprehensive_data)
         response['Content-Disposition'] = 'attachment; filename="comprehensive_agricultural_report.json"'
         return response
         
-    except Exception as e:
-        return JsonResponse({'error': str(e)}, status=500)
+    except DatabaseError:
+        logger.exception("Failed to build the comprehensive report")
+        return OrjsonResponse({'error': 'Report is temporarily unavailable'}, status=503)
+
+# One grouped SELECT per analysis type, in response order; the requested ones are
+# combined with UNION ALL and told apart by their first column
+ANALYSIS_DATA_SQL = {
+    'land': """
+        SELECT 'land', h.ownership_type, NULL, COUNT(h.id), SUM(p.total_area)
+        FROM {holder} h LEFT OUTER JOIN {parcel} p ON p.land_holder_id = h.id
+        GROUP BY h.ownership_type
+    """,
+    'irrigation': """
+        SELECT 'irrigation', system_type, NULL, COUNT(id), AVG(efficiency_rating)
+        FROM {irrigation}
+        GROUP BY system_type
+    """,
+    'crops': """
+        SELECT 'crops', c.name, NULL, SUM(pat.area_allocated), SUM(pat.yield_amount)
+        FROM {pattern} pat INNER JOIN {crop} c ON pat.crop_id = c.id
+        GROUP BY c.name
+    """,
+    'trends': """
+        SELECT 'trends', NULL, year, SUM(yield_amount), SUM(revenue)
+        FROM {pattern}
+        GROUP BY year
+    """,
+}
+ANALYSIS_DATA_KEYS = {
+    'land': 'land_analysis',
+    'irrigation': 'irrigation_analysis',
+    'crops': 'crop_analysis',
+    'trends': 'production_trends',
+}
+
+def _analysis_data(analysis_type):
+    """Analyses for api_analysis_data, all requested types fetched in a single round-trip"""
+    types = [name for name in ANALYSIS_DATA_SQL if analysis_type in ('comprehensive', name)]
+    if not types:
+        return {}
+    
+    qn = connection.ops.quote_name
+    sql = ' UNION ALL '.join(ANALYSIS_DATA_SQL[name] for name in types).format(
+        holder=qn(LandHolder._meta.db_table),
+        parcel=qn(LandParcel._meta.db_table),
+        irrigation=qn(IrrigationSystem._meta.db_table),
+        pattern=qn(CroppingPattern._meta.db_table),
+        crop=qn(Crop._meta.db_table),
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql)
+        rows = cursor.fetchall()
+    
+    # Demultiplex the UNION ALL result by its discriminator column
+    response_data = {ANALYSIS_DATA_KEYS[name]: [] for name in types}
+    for k, name, ref, v1, v2 in rows:
+        if k == 'land':
+            row = {
+                'ownership_type': name,
+                # The UNION promotes the counts to numeric on PostgreSQL
+                'count': int(v1),
+                'total_land': raw_decimal(v2),
+            }
+        elif k == 'irrigation':
+            row = {
+                'system_type': name,
+                'count': int(v1),
+                'avg_efficiency': _float(v2),
+            }
+        elif k == 'crops':
+            row = {
+                'crop__name': name,
+                'total_area': raw_decimal(v1),
+                'total_yield': raw_decimal(v2),
+            }
+        else:
+            row = {
+                'year': ref,
+                'total_yield': raw_decimal(v1),
+                'total_revenue': raw_decimal(v2),
+            }
+        response_data[ANALYSIS_DATA_KEYS[k]].append(row)
+    
+    if 'trends' in types:
+        response_data['production_trends'].sort(key=itemgetter('year'))
+    return response_data
+
+def _analysis_data_cache_key(request):
+    # Only the analysis type shapes the result; the other filters aren't applied yet
+    return api_stats_cache_key('api:analysis_data', request.GET.get('type', 'comprehensive'))
 
 @login_required
 def api_analysis_data(request):
@@ -1012,48 +1130,22 @@ def api_analysis_data(request):
         region_id = request.GET.get('region')
         time_period = request.GET.get('time_period', '30d')
         
-        response_data = {}
-        
-        if analysis_type in ['comprehensive', 'land']:
-            # Land holding analysis
-            land_analysis = LandHolder.objects.values('ownership_type').annotate(
-                count=Count('id'),
-                total_land=Sum('parcels__total_area')
-            )
-            response_data['land_analysis'] = list(land_analysis)
-            
-        if analysis_type in ['comprehensive', 'irrigation']:
-            # Irrigation analysis
-            irrigation_analysis = IrrigationSystem.objects.values('system_type').annotate(
-                count=Count('id'),
-                avg_efficiency=Avg('efficiency_rating')
-            )
-            response_data['irrigation_analysis'] = list(irrigation_analysis)
-            
-        if analysis_type in ['comprehensive', 'crops']:
-            # Crop analysis
-            crop_analysis = CroppingPattern.objects.values('crop__name').annotate(
-                total_area=Sum('area_allocated'),
-                total_yield=Sum('yield_amount')
-            )
-            response_data['crop_analysis'] = list(crop_analysis)
-            
-        if analysis_type in ['comprehensive', 'trends']:
-            # Production trends
-            production_trends = CroppingPattern.objects.values('year').annotate(
-                total_yield=Sum('yield_amount'),
-                total_revenue=Sum('revenue')
-            ).order_by('year')
-            response_data['production_trends'] = list(production_trends)
+        cache_key = _analysis_data_cache_key(request)
+        response_data = cache.get(cache_key)
+        if response_data is not None:
+            return _conditional_json(request, response_data)
         
+        response_data = _analysis_data(analysis_type)
         response_data['status'] = 'success'
-        return JsonResponse(response_data)
+        cache.set(cache_key, response_data, API_STATS_TIMEOUT)
+        return _conditional_json(request, response_data)
         
-    except Exception as e:
-        return JsonResponse({
+    except DatabaseError:
+        logger.exception("Failed to load analysis data")
+        return OrjsonResponse({
             'status': 'error',
-            'message': str(e)
-        }, status=500)
+            'message': 'Statistics are temporarily unavailable'
+        }, status=503)
 
 def handler404(request, exception):
     """Custom 404 handler"""